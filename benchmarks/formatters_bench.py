@@ -0,0 +1,120 @@
+"""
+Compare the template formatters and the template loading with and without
+the bytecode cache.  Run from the repo root:
+
+    python -m benchmarks.formatters_bench
+"""
+
+import random
+import tempfile
+import timeit
+from datetime import datetime
+from pathlib import Path
+
+from jinja2 import Environment, FileSystemLoader
+from jinja2.exceptions import UndefinedError
+
+from pytickrs.details_pane import template_vars
+from pytickrs.formatters import format_date, format_num, is_defined
+from pytickrs.templates import template_environment
+
+
+def old_format_num(num: str) -> str:
+    try:
+        val = int(num)
+        if val < 10000:
+            return f'{val:,d}'
+        if val < 10000000:
+            val = val // 1000
+            return f'{val:,d}K'
+        if val < 10000000000:
+            val = val // 1000000
+            return f'{val:,d}M'
+        if val < 10000000000000:
+            val = val // 1000000000
+            return f'{val:,d}B'
+        val = val // 1000000000000
+        return f'{val:,d}T'
+    except (UndefinedError, ValueError):
+        pass
+    return ''
+
+
+def old_format_date(val: str) -> str:
+    try:
+        return datetime.fromtimestamp(int(val)).strftime('%Y-%m-%d')  # noqa: DTZ006
+    except (UndefinedError, ValueError):
+        pass
+    return ''
+
+
+def old_environment() -> Environment:
+    env = Environment(autoescape=True, loader=FileSystemLoader(''))
+    env.globals['format_num'] = old_format_num
+    env.globals['format_date'] = old_format_date
+    env.globals['is_defined'] = is_defined
+    return env
+
+
+def best(stmt: object, number: int) -> float:
+    """
+    Best of 5 runs, usecs per call
+    """
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number * 1e6  # type: ignore[arg-type]
+
+
+def main() -> None:
+    rng = random.Random(1)  # noqa: S311
+    # the values of a few hundred tickers, formatted over and over
+    nums = [rng.randrange(10**13) for _ in range(500)]
+    dates = [rng.randrange(1_600_000_000, 1_800_000_000) for _ in range(500)]
+    for name, old, new, values in (
+        ('format_num', old_format_num, format_num, nums),
+        ('format_date', old_format_date, format_date, dates),
+    ):
+        t_old = best(lambda f=old, vs=values: [f(v) for v in vs], 200) / len(values)
+        t_new = best(lambda f=new, vs=values: [f(v) for v in vs], 200) / len(values)
+        print(f'{name:12} old {t_old:.3f}us  new {t_new:.3f}us  x{t_old / t_new:.1f}')
+
+    # loading the details template at start
+    template = 'details-template.md'
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = Path(tmp)
+        template_environment(cache).get_template(template)
+        t_old = best(lambda: old_environment().get_template(template), 20)
+        t_new = best(lambda: template_environment(cache).get_template(template), 20)
+        new_tpl = template_environment(cache).get_template(template)
+    print(f'{"load":12} old {t_old:.0f}us  new {t_new:.0f}us  x{t_old / t_new:.1f}')
+
+    # rendering it
+    tvars = template_vars(
+        {
+            'marketCap': nums[0],
+            'volume': nums[1],
+            'averageVolume': nums[2],
+            'earningsTimestamp': dates[0],
+            'dividendDate': dates[1],
+            'companyOfficers': [
+                {'title': 'CEO', 'name': 'X', 'totalPay': n, 'yearBorn': 1970}
+                for n in nums[:10]
+            ],
+        }
+    )
+    for key in (
+        'regularMarketChange',
+        'regularMarketChangePercent',
+        'previousClose',
+        'trailingPE',
+        'epsTrailingTwelveMonths',
+        'targetMeanPrice',
+    ):
+        tvars[key] = 1.0
+    old_tpl = old_environment().get_template(template)
+    t_old = best(lambda: old_tpl.render(tvars), 200)
+    t_new = best(lambda: new_tpl.render(tvars), 200)
+    print(f'{"render":12} old {t_old:.0f}us  new {t_new:.0f}us  x{t_old / t_new:.1f}')
+    return
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Time the screener on a large watchlist: selecting the matches of a few
+expressions and syncing the columns after a batch of records.  Run from the
+repo root:
+
+    python -m benchmarks.screener_bench
+"""
+
+import random
+import timeit
+
+from pytickrs.screener import Screener, compile_expression
+from pytickrs.tickers import headers
+
+symbols_count = 10_000
+batch_size = 64
+expressions = (
+    'Change% < -3 and Price < High1y*0.8',
+    'Price < High1y*0.8',
+    'not (Price > 50 and Price < 60) or Bid / Ask < 0.99',
+)
+
+
+def random_record(rng: random.Random, symbol: str) -> tuple:
+    price = rng.uniform(1, 100)
+    values = {
+        'Low1y': price * rng.uniform(0.5, 1),
+        'Low1d': price * 0.99,
+        'Bid': price * 0.999,
+        'Price': price,
+        'Ask': price * 1.001,
+        'High1d': price * 1.01,
+        'High1y': price * rng.uniform(1, 1.5),
+        'Change': price * rng.uniform(-0.05, 0.05),
+        'Change %': rng.uniform(-8, 8),
+    }
+    return (symbol, *(values[h] for h in headers[1:-1]), '')
+
+
+def best(stmt: object, number: int) -> float:
+    """
+    Best of 5 runs, usecs per call
+    """
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number * 1e6  # type: ignore[arg-type]
+
+
+def main() -> None:
+    rng = random.Random(1)  # noqa: S311
+    symbols = [f'S{i:05d}' for i in range(symbols_count)]
+    records = {s: random_record(rng, s) for s in symbols}
+    universe = set(symbols)
+    screener = Screener(records)
+    for text in expressions:
+        node = compile_expression(text)
+        matches = screener.select(node, universe)
+        t = best(lambda node=node: screener.select(node, universe), 50)
+        print(f'{t / 1000:6.3f}ms  {len(matches):5d} matches  {text}')
+
+    def update() -> None:
+        batch = rng.sample(symbols, batch_size)
+        for s in batch:
+            records[s] = random_record(rng, s)
+        screener.invalidate(batch)
+        screener.sync()
+        return
+
+    t = best(update, 50)
+    print(f'{t / 1000:6.3f}ms  sync after a batch of {batch_size} records')
+    return
+
+
+if __name__ == '__main__':
+    main()
@@ -5,20 +5,29 @@ Run pytickrs
 
 import logging
 import sys
-from argparse import ArgumentParser, ArgumentTypeError, FileType, RawTextHelpFormatter
+from argparse import ArgumentParser, ArgumentTypeError, RawTextHelpFormatter
 from pathlib import Path
 
 from . import __version__
-from .once import run_once
+from .alerts import AlertBook, load_alerts
+from .once import AlertOptions, OutputOptions, run_once
+from .portfolio import Portfolio, load_holdings
+from .recorder import ReplayLog
+from .tickers import load_tickers
 from .tui import run_tui
 
 epilog = """Examples:
     python -m pytickrs --version
     python -m pytickrs --once --ticker=AAPL,MSFT,GOOG
+    python -m pytickrs --once --tickers-from=russell3000.txt --workers=8
+    python -m pytickrs --once --tickers-from desk1.txt desk2.txt --output-dir=out
+    python -m pytickrs --once --alerts=alerts.txt --alert-command=notify-send
+    python -m pytickrs --record=ticks.log
+    python -m pytickrs --replay=ticks.log --speed=10
 """
 
 
-def existing_file_path(path: str) -> bool:
+def existing_file_path(path: str) -> str:
     """
     Custom type function for argparse to validate an existing file path.
     """
@@ -34,15 +43,6 @@ def comma_separated_list(arg: str) -> list[str]:
     return arg.strip().split(',')
 
 
-def load_tickers(f) -> set[str]:
-    tickers: set[str] = set()
-    for line1 in f:
-        line = line1.strip()
-        if line and not line.startswith('#'):
-            tickers.add(line.upper())
-    return tickers
-
-
 def main() -> int:
     """
     Get the tickers info and act on it
@@ -90,9 +90,64 @@ def main() -> int:
     )
     group2.add_argument(
         '--tickers-from',
-        type=FileType('r'),
-        default='tickers.txt',
-        help='Path to a file with tickers (one per line), default: tickers.txt',
+        type=existing_file_path,
+        nargs='+',
+        action='extend',
+        help='Path to one or more files with tickers (one per line), '
+        'default: tickers.txt',
+    )
+    ap.add_argument(
+        '--output-dir',
+        help='With --once, write the table of every tickers file to its own file',
+    )
+    ap.add_argument(
+        '--alerts',
+        type=existing_file_path,
+        help='Path to a file with price alerts (one per line)',
+    )
+    ap.add_argument(
+        '--alert-command',
+        help='Command to run when an alert fires, gets the ticker and the alert text',
+    )
+    ap.add_argument(
+        '--holdings',
+        type=existing_file_path,
+        help='Path to a file with the holdings (symbol, qty, cost basis per line)',
+    )
+    ap.add_argument(
+        '--publish',
+        help='Publish every refreshed snapshot to this memory-mapped columnar file',
+    )
+    ap.add_argument(
+        '--sparkline',
+        action='store_true',
+        default=False,
+        help='Show the intraday price trend of every ticker',
+    )
+    ap.add_argument(
+        '--workers',
+        type=int,
+        default=0,
+        help='Number of processes to shard the fetch across, default: 0 (no pool)',
+    )
+    #
+    # '--record' and '--replay' are mutually exclusive
+    #
+    group3 = ap.add_mutually_exclusive_group()
+    group3.add_argument(
+        '--record',
+        help='Append every fetched batch of quotes to this log',
+    )
+    group3.add_argument(
+        '--replay',
+        type=existing_file_path,
+        help='Replay the quotes recorded with --record instead of fetching them',
+    )
+    ap.add_argument(
+        '--speed',
+        type=float,
+        default=1.0,
+        help='Replay speed, e.g. 10 for 10x, 0 for as fast as possible, default: 1',
     )
 
     args = ap.parse_args()
@@ -101,11 +156,77 @@ def main() -> int:
         return 0
 
     level = logging.DEBUG if args.verbose else logging.INFO
-    tickers = args.tickers if args.tickers else load_tickers(args.tickers_from)
+    try:
+        alerts = AlertBook(load_alerts(args.alerts)) if args.alerts else None
+    except ValueError as err:
+        ap.error(f"malformed alert in '{args.alerts}': {err}")
+    try:
+        portfolio = (
+            Portfolio(load_holdings(args.holdings).values()) if args.holdings else None
+        )
+    except ValueError as err:
+        ap.error(f"malformed holding in '{args.holdings}': {err}")
+    replay_log = ReplayLog(args.replay) if args.replay else None
+    watchlists: dict[str, set[str]] = {}
+    if args.tickers:
+        tickers = set(args.tickers)
+    elif replay_log is not None and not args.tickers_from:
+        # all the recorded tickers
+        tickers = replay_log.symbols()
+        if not tickers:
+            ap.error(f"no quotes recorded in '{args.replay}'")
+    else:
+        try:
+            paths = args.tickers_from or [existing_file_path('tickers.txt')]
+        except ArgumentTypeError as err:
+            ap.error(str(err))
+        # the lists overlap, fetch their union once
+        watchlists = {path: load_tickers(path) for path in paths}
+        tickers = set().union(*watchlists.values())
+    if portfolio is not None:
+        # value all the holdings
+        tickers |= portfolio.holdings.keys()
     if args.once:
-        return run_once(level, tickers)
-
-    return run_tui(level, tickers, args.details_template)
+        if args.output_dir is None and len(watchlists) < 2:
+            # just the one table
+            watchlists = {}
+        elif not watchlists:
+            watchlists = {'tickers': tickers}
+        return run_once(
+            level,
+            tickers,
+            workers=args.workers,
+            output=OutputOptions(
+                watchlists=watchlists,
+                output_dir=args.output_dir,
+                trend=args.sparkline,
+                publish=args.publish,
+                portfolio=portfolio,
+            ),
+            alerting=None
+            if alerts is None
+            else AlertOptions(alerts, args.alert_command),
+            record=args.record,
+            replay_log=replay_log,
+            speed=args.speed,
+        )
+
+    # watch the tickers files unless the tickers are given on the command line
+    return run_tui(
+        level,
+        tickers,
+        args.details_template,
+        workers=args.workers,
+        tickers_paths=list(watchlists),
+        sparkline=args.sparkline,
+        alerts=alerts,
+        alert_command=args.alert_command,
+        publish=args.publish,
+        record=args.record,
+        replay_log=replay_log,
+        speed=args.speed,
+        portfolio=portfolio,
+    )
 
 
 if __name__ == '__main__':
@@ -0,0 +1,198 @@
+"""
+Price alerts loaded from a file, one per line:
+
+    AAPL price > 250        price crosses above 250
+    AAPL price < 180        price crosses below 180
+    AAPL price crosses 200  either way
+    MSFT change% > 3        change % crosses above 3
+    MSFT change% < -3       change % crosses below -3
+    NVDA high52             price reaches the 52-week high
+    NVDA low52              price reaches the 52-week low
+
+Alerts are edge-triggered: they fire when the value crosses the threshold
+between two consecutive records of the ticker, and then not again for the
+debounce period.  The thresholds are kept per ticker and metric in sorted
+lists, so a refresh only looks at the thresholds between the old and the
+new value.
+"""
+
+import shlex
+import subprocess
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable
+from pathlib import Path
+from typing import NamedTuple
+
+from .log import setup_logging
+from .tickers import headers, number
+
+log = setup_logging(__name__)
+
+# do not fire the same alert again for this long, secs
+debounce_period = 300.0
+
+metric_columns = {
+    'price': headers.index('Price'),
+    'change%': headers.index('Change %'),
+}
+price_column = headers.index('Price')
+low1y_column = headers.index('Low1y')
+high1y_column = headers.index('High1y')
+# alerts without a threshold
+extreme_metrics = ('high52', 'low52')
+
+
+class Alert(NamedTuple):
+    symbol: str
+    metric: str
+    # '>', '<' or 'crosses', '' for the extreme metrics
+    op: str
+    level: float
+
+    def describe(self, value: float) -> str:
+        if self.metric == 'high52':
+            return f'{self.symbol} price {value:g} reached the 52-week high'
+        if self.metric == 'low52':
+            return f'{self.symbol} price {value:g} reached the 52-week low'
+        if self.op == 'crosses':
+            return f'{self.symbol} {self.metric} {value:g} crossed {self.level:g}'
+        direction = 'above' if self.op == '>' else 'below'
+        return (
+            f'{self.symbol} {self.metric} {value:g} crossed {direction} {self.level:g}'
+        )
+
+
+def parse_alert(line: str) -> Alert:
+    """
+    Parse the alert definition, raises ValueError if malformed
+    """
+    words = line.split()
+    if len(words) == 2 and words[1].lower() in extreme_metrics:
+        return Alert(words[0].upper(), words[1].lower(), '', 0.0)
+    if len(words) != 4:
+        raise ValueError(f'Expected: SYMBOL METRIC OP LEVEL, got {line!r}')
+    symbol, metric, op, level = words
+    metric = metric.lower()
+    if metric not in metric_columns:
+        raise ValueError(f'Unknown metric {metric!r} in {line!r}')
+    if op not in ('>', '<', 'crosses'):
+        raise ValueError(f'Unknown operator {op!r} in {line!r}')
+    return Alert(symbol.upper(), metric, op, float(level))
+
+
+def load_alerts(fname: str) -> list[Alert]:
+    """
+    Load alerts from file fname
+    """
+    alerts = []
+    path: Path = Path(fname)
+    with path.open(encoding='utf-8') as f:
+        for line1 in f:
+            line = line1.strip()
+            if line and not line.startswith('#'):
+                alerts.append(parse_alert(line))
+    return alerts
+
+
+class Thresholds:
+    """
+    Sorted thresholds of one metric of one ticker
+    """
+
+    def __init__(self, alerts: list[Alert]) -> None:
+        up = sorted((a.level, a) for a in alerts if a.op in ('>', 'crosses'))
+        down = sorted((a.level, a) for a in alerts if a.op in ('<', 'crosses'))
+        self.up_levels = [level for level, _ in up]
+        self.up_alerts = [a for _, a in up]
+        self.down_levels = [level for level, _ in down]
+        self.down_alerts = [a for _, a in down]
+
+    def crossed(self, old: float, new: float) -> list[Alert]:
+        """
+        Alerts with the thresholds crossed moving from old to new
+        """
+        if new > old:
+            # old <= level < new
+            lo = bisect_left(self.up_levels, old)
+            hi = bisect_left(self.up_levels, new)
+            return self.up_alerts[lo:hi]
+        if new < old:
+            # new < level <= old
+            lo = bisect_right(self.down_levels, new)
+            hi = bisect_right(self.down_levels, old)
+            return self.down_alerts[lo:hi]
+        return []
+
+
+class AlertBook:
+    """
+    All the alerts indexed by ticker and metric
+    """
+
+    def __init__(
+        self, alerts: Iterable[Alert], debounce: float = debounce_period
+    ) -> None:
+        self.debounce = debounce
+        grouped: dict[tuple[str, str], list[Alert]] = {}
+        self.extremes: dict[str, list[Alert]] = {}
+        for alert in alerts:
+            if alert.metric in extreme_metrics:
+                self.extremes.setdefault(alert.symbol, []).append(alert)
+            else:
+                grouped.setdefault((alert.symbol, alert.metric), []).append(alert)
+        self.thresholds = {key: Thresholds(group) for key, group in grouped.items()}
+        # when the alert has fired last
+        self.fired_at: dict[Alert, float] = {}
+        return
+
+    def check(
+        self, old: tuple | None, new: tuple, now: float
+    ) -> list[tuple[Alert, str]]:
+        """
+        Alerts fired by the ticker moving from the old to the new record,
+        returns (alert, description)
+        """
+        if old is None:
+            # nothing to cross from yet
+            return []
+        symbol = new[0]
+        fired: list[tuple[Alert, float]] = []
+        for metric, column in metric_columns.items():
+            thresholds = self.thresholds.get((symbol, metric))
+            if thresholds is None:
+                continue
+            v0 = number(old[column])
+            v1 = number(new[column])
+            if v0 is None or v1 is None:
+                continue
+            fired.extend((alert, v1) for alert in thresholds.crossed(v0, v1))
+        p0 = number(old[price_column])
+        p1 = number(new[price_column])
+        if p0 is not None and p1 is not None:
+            for alert in self.extremes.get(symbol, []):
+                if alert.metric == 'high52':
+                    high = number(old[high1y_column])
+                    reached = high is not None and p0 < high <= p1
+                else:
+                    low = number(old[low1y_column])
+                    reached = low is not None and p0 > low >= p1
+                if reached:
+                    fired.append((alert, p1))
+        result = []
+        for alert, value in fired:
+            last = self.fired_at.get(alert)
+            if last is not None and now - last < self.debounce:
+                continue
+            self.fired_at[alert] = now
+            result.append((alert, alert.describe(value)))
+        return result
+
+
+def run_alert_command(command: str, alert: Alert, text: str) -> subprocess.Popen:
+    """
+    Start the alert hook: the command with the symbol and the description
+    appended to its arguments, does not wait for it to complete.
+    """
+    args = [*shlex.split(command), alert.symbol, text]
+    log.debug('Alert command: %s', args)
+    return subprocess.Popen(args, stdin=subprocess.DEVNULL)
@@ -0,0 +1,148 @@
+"""
+Details pane split into the sections of the details template, each in its own
+collapsible.  A section is rendered only once it is expanded, and the rendered
+sections are cached per ticker until its info is fetched again.
+
+The sections are the blocks of the template: title, overview, summary,
+officers and actions.  A template without these blocks is rendered whole.  A
+section failing to render, e.g. for the missing fields of an ETF, is shown as
+not available without taking the other sections with it.
+"""
+
+from typing import Any
+
+from jinja2 import Template
+from jinja2.exceptions import TemplateError
+from textual.app import ComposeResult
+from textual.containers import VerticalScroll
+from textual.widgets import Collapsible, Markdown
+
+from .log import setup_logging
+
+log = setup_logging(__name__)
+
+# template block -> collapsible title
+section_titles = {
+    'overview': 'Overview',
+    'summary': 'Business Summary',
+    'officers': 'Corporate Officers',
+    'actions': 'Corporate Actions',
+}
+# sections expanded at start
+expanded_sections = ('overview',)
+# the block always rendered above the sections
+title_block = 'title'
+# stands for the whole template if it has none of the blocks
+whole_template = ''
+# a section failing to render shows as not available
+render_errors = (TemplateError, TypeError, ValueError)
+
+
+def template_vars(info: dict) -> dict[str, Any]:
+    """
+    Template variables from the ticker info
+    """
+    tvars = dict(info.items())
+    # sanitize data - these are broken for NTDOY
+    for key in ['postMarketPrice', 'postMarketChange', 'postMarketChangePercent']:
+        if key not in tvars:
+            tvars[key] = 0
+        elif tvars[key] == '':
+            tvars[key] = 0
+    return tvars
+
+
+class DetailSection(Collapsible):
+    """
+    Collapsible with the markdown of one template block
+    """
+
+    def __init__(self, block: str, title: str, *, collapsed: bool) -> None:
+        super().__init__(Markdown(open_links=False), title=title, collapsed=collapsed)
+        self.block = block
+        return
+
+
+class DetailsPane(VerticalScroll):
+    """
+    Ticker details rendered section by section on demand
+    """
+
+    def __init__(self, template: Template, *, id: str | None = None) -> None:
+        super().__init__(id=id)
+        self.template = template
+        self.blocks = [b for b in section_titles if b in template.blocks]
+        self.symbol: str | None = None
+        self.tvars: dict[str, Any] = {}
+        # symbol -> (the info rendered, block -> markdown)
+        self.rendered: dict[str, tuple[dict, dict[str, str]]] = {}
+        return
+
+    def compose(self) -> ComposeResult:
+        yield Markdown(id='details-title', open_links=False)
+        if not self.blocks:
+            yield DetailSection(whole_template, 'Details', collapsed=False)
+        for block in self.blocks:
+            yield DetailSection(
+                block,
+                section_titles[block],
+                collapsed=block not in expanded_sections,
+            )
+        return
+
+    def render_block(self, block: str) -> str:
+        """
+        Markdown of the block for the shown ticker, cached
+        """
+        assert self.symbol is not None
+        cache = self.rendered[self.symbol][1]
+        markdown = cache.get(block)
+        if markdown is None:
+            log.debug('Rendering %s of %s', block or 'details', self.symbol)
+            if block == whole_template:
+                markdown = self.template.render(self.tvars)
+            else:
+                context = self.template.new_context(self.tvars)
+                markdown = ''.join(self.template.blocks[block](context))
+            cache[block] = markdown
+        return markdown
+
+    def update_section(self, section: DetailSection) -> None:
+        try:
+            markdown = self.render_block(section.block).strip()
+        except render_errors as err:
+            # e.g. an ETF lacks the fields of a company
+            log.debug('Failed to render %s: %s', section.block, err)
+            markdown = ''
+        section.query_one(Markdown).update(markdown or '_Not available_')
+        return
+
+    def show(self, symbol: str, info: dict) -> None:
+        """
+        Show the ticker, render just the expanded sections
+        """
+        self.symbol = symbol
+        self.tvars = template_vars(info)
+        cached = self.rendered.get(symbol)
+        if cached is None or cached[0] is not info:
+            # the info was fetched again since
+            self.rendered[symbol] = (info, {})
+        title = self.query_one('#details-title', Markdown)
+        if title_block in self.template.blocks:
+            try:
+                title.update(self.render_block(title_block))
+            except render_errors:
+                title.update(f'# {symbol}')
+        for section in self.query(DetailSection):
+            if section.collapsed:
+                # rendered once expanded
+                section.query_one(Markdown).update('')
+            else:
+                self.update_section(section)
+        return
+
+    def on_collapsible_expanded(self, event: Collapsible.Expanded) -> None:
+        section = event.collapsible
+        if self.symbol is not None and isinstance(section, DetailSection):
+            self.update_section(section)
+        return
@@ -0,0 +1,140 @@
+"""
+Fetch tickers info, optionally sharded across a process pool.
+
+Each worker fetches and analyzes its shard of symbols and sends back compact
+records (tuples aligned with `headers`) and, for the sparklines, the new
+intraday bars instead of the yfinance objects, so the parent only merges
+the results.
+"""
+
+import math
+import multiprocessing
+from collections.abc import Iterable, Iterator, Mapping
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import NamedTuple
+
+import pandas as pd
+import yfinance as yf
+
+from .log import setup_logging
+from .sparkline import sparkline_interval
+from .tickers import info_record
+
+log = setup_logging(__name__)
+
+# upper bound on the shard size so the results keep streaming back
+max_shard_size = 64
+# shards per worker, more shards even out the slow ones
+shards_per_worker = 4
+
+
+class Batch(NamedTuple):
+    """
+    Fetched records and, if asked for, the intraday bars newer than given
+    """
+
+    records: list[tuple]
+    bars: dict[str, list[tuple[int, float]]]
+
+
+def fetch_tickers(
+    tickers: Iterable[str], bars_since: Mapping[str, int] | None = None
+) -> tuple[yf.Tickers, Batch]:
+    """
+    Fetch tickers in this process.
+    bars_since: symbol -> time of the last known bar, None for no bars
+    """
+    tkrs = yf.Tickers(list(tickers))
+    interval = '1d' if bars_since is None else sparkline_interval
+    history = tkrs.history(period='1d', interval=interval, repair=True, progress=False)
+    bars = {} if bars_since is None else history_bars(history, bars_since)
+    return tkrs, Batch(tickers_records(tkrs), bars)
+
+
+def tickers_records(tkrs: yf.Tickers) -> list[tuple]:
+    """
+    Compact records for the fetched tickers
+    """
+    return [info_record(symbol, ticker.info) for symbol, ticker in tkrs.tickers.items()]
+
+
+def history_bars(
+    history: pd.DataFrame | None, since: Mapping[str, int]
+) -> dict[str, list[tuple[int, float]]]:
+    """
+    Close prices per symbol as (POSIX time, close), only the ones since, the
+    bar at since is still forming
+    """
+    bars: dict[str, list[tuple[int, float]]] = {}
+    if history is None or history.empty:
+        return bars
+    close = history['Close']
+    index = pd.DatetimeIndex(close.index)
+    times = index.to_numpy(dtype='datetime64[s]').astype('int64')
+    for symbol in close.columns:
+        last = since.get(symbol, 0)
+        bars[symbol] = [
+            (int(t), float(v))
+            for t, v in zip(times, close[symbol].to_numpy(), strict=True)
+            if t >= last and not math.isnan(v)
+        ]
+    return bars
+
+
+def fetch_shard(
+    tickers: list[str], bars_since: Mapping[str, int] | None = None
+) -> Batch:
+    """
+    Fetch and analyze a shard of tickers, runs in a worker process
+    """
+    return fetch_tickers(tickers, bars_since)[1]
+
+
+def shard(tickers: list[str], size: int) -> list[list[str]]:
+    """
+    Split tickers into the shards of up to size symbols
+    """
+    return [tickers[i : i + size] for i in range(0, len(tickers), size)]
+
+
+def shard_since(
+    tickers: list[str], bars_since: Mapping[str, int] | None
+) -> dict[str, int] | None:
+    """
+    Send the workers only the part of bars_since for their shard
+    """
+    if bars_since is None:
+        return None
+    return {symbol: bars_since[symbol] for symbol in tickers if symbol in bars_since}
+
+
+def fetch_batches(
+    tickers: Iterable[str],
+    workers: int = 0,
+    bars_since: Mapping[str, int] | None = None,
+) -> Iterator[Batch]:
+    """
+    Fetch tickers, yield the batches as the shards complete.
+    With fewer than 2 workers everything is fetched in this process.
+    """
+    symbols = sorted(tickers)
+    if workers < 2 or len(symbols) < 2:
+        yield fetch_shard(symbols, bars_since)
+        return
+
+    size = -(-len(symbols) // (workers * shards_per_worker))
+    size = max(1, min(size, max_shard_size))
+    shards = shard(symbols, size)
+    log.debug('Fetching %d tickers in %d shards', len(symbols), len(shards))
+    # do not fork a process with the running threads, e.g. the TUI
+    context = multiprocessing.get_context('spawn')
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+    try:
+        futures = [
+            pool.submit(fetch_shard, s, shard_since(s, bars_since)) for s in shards
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+    return
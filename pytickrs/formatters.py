@@ -0,0 +1,73 @@
+"""
+Formatters exposed to the details template as globals.
+
+The template formats the same few values again and again, e.g. on every
+highlight of a row, so the formatted strings are cached by value and the
+common case of an int skips the parsing and exception handling.
+"""
+
+import time
+from functools import lru_cache
+
+from jinja2.exceptions import UndefinedError
+
+# values below the limit are shown divided by the divisor with the suffix
+num_scales = (
+    (10_000, 1, ''),
+    (10_000_000, 1_000, 'K'),
+    (10_000_000_000, 1_000_000, 'M'),
+    (10_000_000_000_000, 1_000_000_000, 'B'),
+)
+# formatted values to keep
+cache_size = 4096
+
+
+@lru_cache(maxsize=cache_size)
+def format_int(val: int) -> str:
+    for limit, divisor, suffix in num_scales:
+        if val < limit:
+            return f'{val // divisor:,d}{suffix}'
+    return f'{val // 1_000_000_000_000:,d}T'
+
+
+def format_num(num: object) -> str:
+    """
+    Abbreviated number, e.g. 12K, 3M, 4B, empty if not a number
+    """
+    if type(num) is int:
+        return format_int(num)
+    try:
+        val = int(num)  # type: ignore[call-overload]
+    except (UndefinedError, TypeError, ValueError):
+        return ''
+    return format_int(val)
+
+
+@lru_cache(maxsize=cache_size)
+def format_timestamp(val: int) -> str:
+    try:
+        tm = time.localtime(val)
+    except (OverflowError, OSError, ValueError):
+        return ''
+    return f'{tm.tm_year:04d}-{tm.tm_mon:02d}-{tm.tm_mday:02d}'
+
+
+def format_date(val: object) -> str:
+    """
+    Local date of the POSIX timestamp, e.g. 2025-01-31, empty if not a number
+    """
+    if type(val) is int:
+        return format_timestamp(val)
+    try:
+        ts = int(val)  # type: ignore[call-overload]
+    except (UndefinedError, TypeError, ValueError):
+        return ''
+    return format_timestamp(ts)
+
+
+def is_defined(val: object) -> bool:
+    try:
+        return True
+    except UndefinedError:
+        pass
+    return False
@@ -1,8 +1,19 @@
-import yfinance as yf
+import time
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+from typing import NamedTuple
+
 from tabulate import tabulate
 
+from .alerts import Alert, AlertBook, run_alert_command
+from .fetch import fetch_batches
 from .log import eprint, setup_logging
-from .tickers import analyze_ticker, headers
+from .portfolio import Portfolio, portfolio_headers
+from .publish import publish_snapshot
+from .recorder import Frame, Recorder, ReplayLog, Throughput, replay
+from .snapshot import load_snapshot, save_snapshot
+from .sparkline import Sparklines, sparkline_header
+from .tickers import headers
 
 log = setup_logging(__name__)
 
@@ -12,52 +23,261 @@ epilog = """Examples:
 """
 
 
-def process_tickers(tickers: set[str]) -> None:
-    """
-    Process tickers
-    """
-    tkrs = yf.Tickers(list(tickers))
-    tkrs.history(period='1d', repair=True, progress=False)
-
-    # Define the headers for the table
-
-    table_data = []
-    for ticker in tkrs.tickers.values():
-        info = ticker.info
-        # print(info)
-        table_data.append(
-            [
-                ticker.ticker,
-                info.get('fiftyTwoWeekLow'),
-                info.get('dayLow'),
-                # the highest price a buyer is ready to pay
-                info.get('bid'),
-                info.get('currentPrice'),
-                # the lowest price a seller is ready to accept
-                info.get('ask'),
-                info.get('dayHigh'),
-                info.get('fiftyTwoWeekHigh'),
-                info.get('regularMarketChange'),
-                info.get('regularMarketChangePercent'),
-                '; '.join(analyze_ticker(ticker)),
-            ]
-        )
+def watchlist_outputs(names: Iterable[str], output_dir: str) -> dict[str, Path]:
+    """
+    Output file per watchlist: output_dir/<list stem>.txt, numbered if the
+    stems clash
+    """
+    outputs: dict[str, Path] = {}
+    used: set[str] = set()
+    for name in names:
+        stem = Path(name).stem
+        unique = stem
+        n = 1
+        while unique in used:
+            n += 1
+            unique = f'{stem}-{n}'
+        used.add(unique)
+        outputs[name] = Path(output_dir) / f'{unique}.txt'
+    return outputs
+
+
+def format_table(
+    records: Mapping[str, tuple],
+    symbols: Iterable[str],
+    sparklines: Sparklines | None = None,
+    portfolio: Portfolio | None = None,
+) -> str:
+    """
+    Table of the fetched records of symbols sorted by ticker, the symbols
+    which failed to fetch are skipped
+    """
+    rows: list = [records[symbol] for symbol in sorted(symbols) if symbol in records]
+    table_headers: tuple = headers
+    if sparklines is not None:
+        table_headers = (*table_headers, sparkline_header)
+        rows = [[*row, sparklines.render(row[0])] for row in rows]
+    if portfolio is not None:
+        table_headers = (*table_headers, *portfolio_headers)
+        rows = [[*row, *portfolio.cells(row[0])] for row in rows]
+    return str(tabulate(rows, headers=table_headers, tablefmt='simple'))
+
+
+class OutputOptions(NamedTuple):
+    """
+    Where and what to output besides the table of all the tickers
+    """
+
+    # list name -> symbols, a table per list, written to output_dir if given
+    watchlists: Mapping[str, set[str]] | None = None
+    output_dir: str | None = None
+    # show the sparklines
+    trend: bool = False
+    # path to publish the columnar snapshot to
+    publish: str | None = None
+    # the holdings to value, the totals are printed after the tables
+    portfolio: Portfolio | None = None
+
+
+class AlertOptions(NamedTuple):
+    """
+    The alerts to check and the command to run when they fire
+    """
+
+    alerts: AlertBook
+    command: str | None = None
+
+
+class Quotes(NamedTuple):
+    """
+    The fetched or replayed records, their bars and the fired alerts
+    """
+
+    records: dict[str, tuple]
+    sparklines: Sparklines
+    fired: list[tuple[Alert, str]]
 
-    # sort by ticker
-    sorted_data = sorted(table_data, key=lambda x: x[0])
-    print(tabulate(sorted_data, headers=headers, tablefmt='simple'))
+
+def collect_quotes(
+    tickers: set[str],
+    frames: Iterable[Frame],
+    *,
+    alerts: AlertBook | None = None,
+    recorder: Recorder | None = None,
+    portfolio: Portfolio | None = None,
+    last_known: Mapping[str, tuple[float, tuple]] | None = None,
+) -> Quotes:
+    """
+    Merge the frames into the latest record per ticker, checking the alerts
+    on the way.  last_known: symbol -> (time, record) to check the first
+    record of a ticker against.
+    """
+    quotes = Quotes({}, Sparklines(), [])
+    records = quotes.records
+    for frame in frames:
+        if recorder is not None:
+            try:
+                recorder.append(frame.batch, frame.time)
+            except OSError as err:
+                log.warning('Failed to record: %s', err)
+        for record in frame.batch.records:
+            symbol = record[0]
+            if symbol not in tickers:
+                continue
+            if alerts is not None:
+                entry = (last_known or {}).get(symbol)
+                old = records.get(symbol, None if entry is None else entry[1])
+                quotes.fired.extend(alerts.check(old, record, frame.time))
+            records[symbol] = record
+            if portfolio is not None:
+                portfolio.update(record)
+        for symbol, bars in frame.batch.bars.items():
+            quotes.sparklines.append(symbol, bars)
+    return quotes
+
+
+def write_tables(quotes: Quotes, output: OutputOptions) -> None:
+    """
+    Print the tables, or write them to the output directory
+    """
+    records = quotes.records
+    shown = quotes.sparklines if output.trend else None
+    portfolio = output.portfolio
+    watchlists = output.watchlists
+    if not watchlists:
+        print(format_table(records, records, shown, portfolio))
+    elif output.output_dir is not None:
+        Path(output.output_dir).mkdir(parents=True, exist_ok=True)
+        outputs = watchlist_outputs(watchlists, output.output_dir)
+        for name, symbols in watchlists.items():
+            table = format_table(records, symbols, shown, portfolio)
+            outputs[name].write_text(table + '\n', encoding='utf-8')
+            log.debug('Wrote %s', outputs[name])
+    else:
+        for i, (name, symbols) in enumerate(watchlists.items()):
+            if i:
+                print()
+            print(f'==> {name} <==')
+            print(format_table(records, symbols, shown, portfolio))
+    if portfolio is not None:
+        print(f'Portfolio: {portfolio.summary()}')
+    return
+
+
+def run_alert_hooks(fired: list[tuple[Alert, str]], command: str | None) -> None:
+    """
+    Print the fired alerts and run the alert command for each
+    """
+    hooks = []
+    for alert, text in fired:
+        print(f'ALERT: {text}')
+        if not command:
+            continue
+        try:
+            hooks.append(run_alert_command(command, alert, text))
+        except OSError as err:
+            log.warning('Alert command failed: %s', err)
+    for hook in hooks:
+        hook.wait()
     return
 
 
-def run_once(log_level: int, tickers: set[str]) -> int:
+def process_tickers(
+    tickers: set[str],
+    *,
+    workers: int = 0,
+    output: OutputOptions | None = None,
+    alerting: AlertOptions | None = None,
+    recorder: Recorder | None = None,
+    frames: Iterable[Frame] | None = None,
+) -> int:
+    """
+    Process tickers, returns the exit code.
+    When output.watchlists are given tickers is their union, fetched once.
+    recorder: where to record the fetched batches.
+    frames: the recorded batches to replay instead of fetching.
+    """
+    if output is None:
+        output = OutputOptions()
+    alerts = None if alerting is None else alerting.alerts
+    replaying = frames is not None
+    # the alerts fire on crossing from the last known values, a replay starts
+    # from none
+    last_known = load_snapshot() if alerts is not None and not replaying else {}
+    if frames is None:
+        batches = fetch_batches(tickers, workers, {} if output.trend else None)
+        frames = (Frame(time.time(), batch) for batch in batches)
+    try:
+        quotes = collect_quotes(
+            tickers,
+            frames,
+            alerts=alerts,
+            recorder=recorder,
+            portfolio=output.portfolio,
+            last_known=last_known,
+        )
+    except OSError as err:
+        eprint(f'Failed to {"replay" if replaying else "fetch"} the quotes: {err}')
+        return 1
+    if not replaying:
+        try:
+            # let the TUI start with these
+            save_snapshot(quotes.records, {})
+        except OSError as err:
+            log.warning('Failed to save the snapshot: %s', err)
+    if output.publish is not None:
+        try:
+            publish_snapshot(output.publish, quotes.records, {})
+        except OSError as err:
+            log.warning('Failed to publish the snapshot: %s', err)
+
+    try:
+        write_tables(quotes, output)
+    except OSError as err:
+        eprint(f'Failed to write the output: {err}')
+        return 1
+    run_alert_hooks(quotes.fired, None if alerting is None else alerting.command)
+    return 0
+
+
+def run_once(
+    log_level: int,
+    tickers: set[str],
+    *,
+    workers: int = 0,
+    output: OutputOptions | None = None,
+    alerting: AlertOptions | None = None,
+    record: str | None = None,
+    replay_log: ReplayLog | None = None,
+    speed: float = 1.0,
+) -> int:
     """
     Main entry point
     """
     log.setLevel(log_level)
+    try:
+        recorder = None if record is None else Recorder(record)
+    except OSError as err:
+        eprint(f"ERROR: failed to open '{record}': {err}")
+        return 1
 
+    throughput = Throughput()
     try:
-        process_tickers(tickers)
-        return 0
+        rc = process_tickers(
+            tickers,
+            workers=workers,
+            output=output,
+            alerting=alerting,
+            recorder=recorder,
+            frames=(
+                None
+                if replay_log is None
+                else throughput.count(replay(replay_log, speed))
+            ),
+        )
+        if replay_log is not None:
+            eprint(throughput)
+        return rc
 
     except KeyboardInterrupt:
         eprint('Caught KeyboardInterrupt')
@@ -0,0 +1,172 @@
+"""
+Holdings loaded from a file, one lot per line, the cost basis is per share:
+
+    # SYMBOL QTY COST
+    AAPL 10 150.25
+    MSFT 5 310
+
+The lots of the same ticker are merged.  The portfolio totals are kept up to
+date incrementally: a refreshed ticker takes back its old contribution and
+adds the new one, the other positions are not looked at.
+"""
+
+from collections.abc import Iterable
+from pathlib import Path
+from typing import NamedTuple
+
+from .log import setup_logging
+from .tickers import headers, number
+
+log = setup_logging(__name__)
+
+value_header = 'Value'
+day_pnl_header = 'Day P&L'
+total_pnl_header = 'Total P&L'
+portfolio_headers = (value_header, day_pnl_header, total_pnl_header)
+
+price_column = headers.index('Price')
+change_column = headers.index('Change')
+
+
+class Holding(NamedTuple):
+    symbol: str
+    qty: float
+    # per share
+    cost: float
+
+
+class Position(NamedTuple):
+    value: float
+    # None if the day change is not known
+    day_pnl: float | None
+    total_pnl: float
+
+
+def parse_holding(line: str) -> Holding:
+    """
+    Parse the holding definition, raises ValueError if malformed
+    """
+    words = line.replace(',', ' ').split()
+    if len(words) != 3:
+        raise ValueError(f'Expected: SYMBOL QTY COST, got {line!r}')
+    symbol, qty, cost = words
+    return Holding(symbol.upper(), float(qty), float(cost))
+
+
+def load_holdings(fname: str) -> dict[str, Holding]:
+    """
+    Load holdings from file fname, the lots of a ticker are merged
+    """
+    holdings: dict[str, Holding] = {}
+    path: Path = Path(fname)
+    with path.open(encoding='utf-8') as f:
+        for line1 in f:
+            line = line1.strip()
+            if not line or line.startswith('#'):
+                continue
+            lot = parse_holding(line)
+            held = holdings.get(lot.symbol)
+            if held is not None:
+                qty = held.qty + lot.qty
+                cost = held.qty * held.cost + lot.qty * lot.cost
+                lot = Holding(lot.symbol, qty, cost / qty if qty else 0.0)
+            holdings[lot.symbol] = lot
+    return holdings
+
+
+def position(holding: Holding, record: tuple) -> Position | None:
+    """
+    The position at the record prices, None without the price
+    """
+    price = number(record[price_column])
+    if price is None:
+        return None
+    change = number(record[change_column])
+    value = holding.qty * price
+    return Position(
+        value,
+        None if change is None else holding.qty * change,
+        value - holding.qty * holding.cost,
+    )
+
+
+def format_money(value: float, *, sign: bool = False) -> str:
+    return f'{value:+,.2f}' if sign else f'{value:,.2f}'
+
+
+class Portfolio:
+    """
+    Positions and their totals, updated one ticker at a time
+    """
+
+    def __init__(self, holdings: Iterable[Holding]) -> None:
+        self.holdings = {h.symbol: h for h in holdings}
+        self.positions: dict[str, Position] = {}
+        # totals of the positions with the known prices
+        self.cost = 0.0
+        self.value = 0.0
+        self.day_pnl = 0.0
+        self.total_pnl = 0.0
+        return
+
+    def __contains__(self, symbol: object) -> bool:
+        """Tell if the ticker is held."""
+        return symbol in self.holdings
+
+    def add_position(self, pos: Position, sign: float) -> None:
+        self.cost += sign * (pos.value - pos.total_pnl)
+        self.value += sign * pos.value
+        self.day_pnl += sign * (pos.day_pnl or 0.0)
+        self.total_pnl += sign * pos.total_pnl
+        return
+
+    def update(self, record: tuple) -> bool:
+        """
+        Re-value the ticker of the record, returns True if it is held
+        """
+        holding = self.holdings.get(record[0])
+        if holding is None:
+            return False
+        self.remove(holding.symbol)
+        pos = position(holding, record)
+        if pos is not None:
+            self.positions[holding.symbol] = pos
+            self.add_position(pos, 1.0)
+        return True
+
+    def remove(self, symbol: str) -> None:
+        """
+        Take the ticker out of the totals
+        """
+        old = self.positions.pop(symbol, None)
+        if old is not None:
+            self.add_position(old, -1.0)
+        return
+
+    def cells(self, symbol: str) -> list[float | str]:
+        """
+        Value, day P&L and total P&L cells of the ticker
+        """
+        pos = self.positions.get(symbol)
+        if pos is None:
+            return ['.' if symbol in self.holdings else ''] * len(portfolio_headers)
+        return [round(v, 2) if v is not None else '.' for v in pos]
+
+    def sort_value(self, symbol: str, header: str) -> float | None:
+        pos = self.positions.get(symbol)
+        if pos is None:
+            return None
+        return pos[portfolio_headers.index(header)]
+
+    def summary(self) -> str:
+        """
+        The totals, e.g. for the status line
+        """
+        text = (
+            f'Value {format_money(self.value)}'
+            f'  Day P&L {format_money(self.day_pnl, sign=True)}'
+            f'  Total P&L {format_money(self.total_pnl, sign=True)}'
+        )
+        if self.positions and self.cost:
+            text += f' ({self.total_pnl / self.cost:+.1%})'
+        return text
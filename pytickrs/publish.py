@@ -0,0 +1,269 @@
+"""
+Publish the ticker records as a memory-mapped columnar file, so other tools
+can read the quotes without parsing or fetching them again.
+
+The layout follows Arrow's: every column is a contiguous little-endian buffer
+aligned to 8 bytes, numbers are float64 with NaN for the missing values,
+strings are int32 offsets followed by the UTF-8 data.  All integers are
+little-endian:
+
+    header:     magic, version, sequence, published at, rows, columns
+    directory:  per column - name, type, offset and length of each buffer
+    buffers
+
+The float columns are zero-copy memoryviews on the little-endian hosts, on
+the others they are copied and byte-swapped on reading.
+
+Every publish writes a new file and renames it over the old one, so a reader
+never sees a partial file.  The sequence grows by one with every publish,
+readers compare it to tell a new version.
+"""
+
+import math
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+from typing import Any, Literal, Self
+
+from .log import setup_logging
+from .tickers import header2ticker_info, headers, number
+
+log = setup_logging(__name__)
+
+magic = b'PYTKCOL1'
+version = 1
+# magic, version, sequence, published at, rows, columns
+file_header = struct.Struct('<8sIQdII')
+# name, type, offset and length of the data, offset and length of the offsets
+column_entry = struct.Struct('<32s1s7xQQQQ')
+float_type = b'f'
+string_type = b's'
+alignment = 8
+
+# the published columns and their types
+published_columns = {
+    **{
+        header: string_type if header not in header2ticker_info else float_type
+        for header in headers
+    },
+    'Fetched at': float_type,
+}
+
+
+def padded(size: int) -> int:
+    return -(-size // alignment) * alignment
+
+
+def encode_floats(values: list[float]) -> tuple[bytes, bytes]:
+    return struct.pack(f'<{len(values)}d', *values), b''
+
+
+def encode_strings(values: list[str]) -> tuple[bytes, bytes]:
+    data = [v.encode('utf-8') for v in values]
+    offsets = [0]
+    for d in data:
+        offsets.append(offsets[-1] + len(d))
+    return b''.join(data), struct.pack(f'<{len(offsets)}i', *offsets)
+
+
+def read_sequence(path: str | Path) -> int:
+    """
+    Sequence of the published file, 0 if there is none, reads the header only
+    """
+    try:
+        with Path(path).open('rb') as f:
+            head = f.read(file_header.size)
+    except FileNotFoundError:
+        return 0
+    if len(head) < file_header.size:
+        return 0
+    tag, _, sequence, _, _, _ = file_header.unpack(head)
+    return sequence if tag == magic else 0
+
+
+def publish_snapshot(
+    path: str | Path,
+    records: Mapping[str, tuple],
+    fetched_at: Mapping[str, float],
+) -> int:
+    """
+    Write the records sorted by ticker to path atomically, returns the sequence
+    """
+    path = Path(path)
+    sequence = read_sequence(path) + 1
+    symbols = sorted(records)
+    columns: list[tuple[str, bytes, bytes, bytes]] = []
+    for i, header in enumerate(headers):
+        values = [records[symbol][i] for symbol in symbols]
+        if published_columns[header] == float_type:
+            data, offsets = encode_floats(
+                [math.nan if (v := number(value)) is None else v for value in values]
+            )
+        else:
+            data, offsets = encode_strings([str(v or '') for v in values])
+        columns.append((header, published_columns[header], data, offsets))
+    now = time.time()
+    data, offsets = encode_floats([fetched_at.get(s, now) for s in symbols])
+    columns.append(('Fetched at', float_type, data, offsets))
+
+    offset = padded(file_header.size + column_entry.size * len(columns))
+    directory = []
+    buffers = []
+    for name, kind, data, offsets in columns:
+        offsets_at = offset
+        offset += padded(len(offsets))
+        data_at = offset
+        offset += padded(len(data))
+        directory.append(
+            column_entry.pack(
+                name.encode('utf-8'), kind, data_at, len(data), offsets_at, len(offsets)
+            )
+        )
+        buffers += [offsets.ljust(padded(len(offsets)), b'\0')]
+        buffers += [data.ljust(padded(len(data)), b'\0')]
+    head = file_header.pack(
+        magic, version, sequence, now, len(symbols), len(columns)
+    ) + b''.join(directory)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f'.{os.getpid()}.tmp')
+    with tmp.open('wb') as f:
+        f.write(head.ljust(padded(len(head)), b'\0'))
+        for buf in buffers:
+            f.write(buf)
+    tmp.replace(path)
+    log.debug('Published %d tickers to %s, sequence %d', len(symbols), path, sequence)
+    return sequence
+
+
+def little_endian(buf: memoryview, fmt: Literal['d', 'i']) -> Sequence[Any]:
+    """
+    The buffer of little-endian values, zero-copy if the host is little-endian
+    """
+    if sys.byteorder == 'little':
+        return buf.cast(fmt)
+    values = array(fmt, bytes(buf))
+    values.byteswap()
+    return values
+
+
+def release(column: object) -> None:
+    """
+    Release the column if a view of the map, the byte-swapped copies are not
+    """
+    if isinstance(column, memoryview):
+        column.release()
+    return
+
+
+class StringColumn(Sequence[str]):
+    """
+    Strings decoded on access from the offsets and the UTF-8 data
+    """
+
+    def __init__(self, offsets: Sequence[int], data: memoryview) -> None:
+        self.offsets = offsets
+        self.data = data
+        return
+
+    def __len__(self) -> int:
+        """Number of the strings."""
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:  # type: ignore[override]
+        """The i-th string."""
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return str(self.data[self.offsets[i] : self.offsets[i + 1]], 'utf-8')
+
+
+class PublishedSnapshot:
+    """
+    Memory-mapped published snapshot, the float columns are zero-copy
+    memoryviews of float64 on the little-endian hosts
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        with Path(path).open('rb') as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = memoryview(self.mmap)
+        tag, ver, self.sequence, self.published_at, self.rows, ncolumns = (
+            file_header.unpack_from(buf)
+        )
+        if tag != magic or ver != version:
+            buf.release()
+            self.mmap.close()
+            raise ValueError(f'{path} is not a pytickrs snapshot')
+        self.columns: dict[str, Sequence[float] | StringColumn] = {}
+        for i in range(ncolumns):
+            name, kind, data_at, data_len, offsets_at, offsets_len = (
+                column_entry.unpack_from(buf, file_header.size + i * column_entry.size)
+            )
+            data = buf[data_at : data_at + data_len]
+            column: Sequence[float] | StringColumn
+            if kind == float_type:
+                column = little_endian(data, 'd')
+            else:
+                offsets = buf[offsets_at : offsets_at + offsets_len]
+                column = StringColumn(little_endian(offsets, 'i'), data)
+            self.columns[name.rstrip(b'\0').decode('utf-8')] = column
+        self.buf = buf
+        return
+
+    def __enter__(self) -> Self:
+        """Use as a context manager to close the mapping."""
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """Close the mapping."""
+        self.close()
+        return
+
+    def records(self) -> dict[str, tuple]:
+        """
+        Copy the rows back into records aligned with the headers
+        """
+        symbols = self.strings('TIKR')
+        result: dict[str, tuple] = {}
+        for row in range(self.rows):
+            record: list[float | str | None] = []
+            for header in headers:
+                value = self.columns[header][row]
+                if isinstance(value, float) and math.isnan(value):
+                    record.append(None)
+                else:
+                    record.append(value)
+            result[symbols[row]] = tuple(record)
+        return result
+
+    def floats(self, name: str) -> Sequence[float]:
+        column = self.columns[name]
+        if isinstance(column, StringColumn):
+            raise TypeError(f'{name} is not a float column')
+        return column
+
+    def strings(self, name: str) -> StringColumn:
+        column = self.columns[name]
+        if not isinstance(column, StringColumn):
+            raise TypeError(f'{name} is not a string column')
+        return column
+
+    def close(self) -> None:
+        """
+        Release the views and unmap the file
+        """
+        for column in self.columns.values():
+            if isinstance(column, StringColumn):
+                release(column.offsets)
+                release(column.data)
+            else:
+                release(column)
+        self.columns = {}
+        self.buf.release()
+        self.mmap.close()
+        return
@@ -0,0 +1,300 @@
+"""
+Record the fetched batches to an append-only log and replay them.
+
+The log is a sequence of frames, one per batch, each a header followed by the
+zlib-compressed batch:
+
+    header:     time, length of the payload, crc32 of the payload
+    payload:    records, then bars
+
+The numbers in the records are float64 with NaN for the missing values, the
+strings are UTF-8 prefixed with their length.  A torn frame at the end, e.g.
+after a crash, is ignored on reading and overwritten by the next append.
+
+The time index is kept aside in PATH.idx: (time, offset) of every frame, so
+the replay can start at any time without reading the log up to it.  It is
+rebuilt from the log if missing or behind.
+"""
+
+import math
+import struct
+import threading
+import time
+import zlib
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import BinaryIO, NamedTuple
+
+from .fetch import Batch
+from .log import setup_logging
+from .tickers import headers, number
+
+log = setup_logging(__name__)
+
+# time, payload length, payload crc32
+frame_header = struct.Struct('<dII')
+# time, frame offset
+index_entry = struct.Struct('<dQ')
+# the numeric fields of a record, between the symbol and the thoughts
+record_numbers = struct.Struct(f'<{len(headers) - 2}d')
+length = struct.Struct('<I')
+bar = struct.Struct('<qd')
+compression_level = 6
+
+
+class Frame(NamedTuple):
+    """
+    A batch and when it was recorded
+    """
+
+    time: float
+    batch: Batch
+
+
+def pack_str(value: object) -> bytes:
+    data = str(value or '').encode('utf-8')
+    return length.pack(len(data)) + data
+
+
+def unpack_str(buf: bytes, offset: int) -> tuple[str, int]:
+    (n,) = length.unpack_from(buf, offset)
+    offset += length.size
+    return buf[offset : offset + n].decode('utf-8'), offset + n
+
+
+def encode_batch(batch: Batch) -> bytes:
+    """
+    Uncompressed binary form of the batch
+    """
+    parts = [length.pack(len(batch.records))]
+    for record in batch.records:
+        parts.append(pack_str(record[0]))
+        parts.append(
+            record_numbers.pack(
+                *(math.nan if (v := number(n)) is None else v for n in record[1:-1])
+            )
+        )
+        parts.append(pack_str(record[-1]))
+    parts.append(length.pack(len(batch.bars)))
+    for symbol, bars in batch.bars.items():
+        parts.append(pack_str(symbol))
+        parts.append(length.pack(len(bars)))
+        parts.extend(bar.pack(t, close) for t, close in bars)
+    return b''.join(parts)
+
+
+def decode_batch(buf: bytes) -> Batch:
+    """
+    The batch back from its binary form, NaN numbers become None
+    """
+    (n,) = length.unpack_from(buf, 0)
+    offset = length.size
+    records = []
+    for _ in range(n):
+        symbol, offset = unpack_str(buf, offset)
+        numbers = record_numbers.unpack_from(buf, offset)
+        offset += record_numbers.size
+        thoughts, offset = unpack_str(buf, offset)
+        records.append(
+            (symbol, *(None if math.isnan(v) else v for v in numbers), thoughts)
+        )
+    (n,) = length.unpack_from(buf, offset)
+    offset += length.size
+    bars = {}
+    for _ in range(n):
+        symbol, offset = unpack_str(buf, offset)
+        (count,) = length.unpack_from(buf, offset)
+        offset += length.size
+        bars[symbol] = [
+            bar.unpack_from(buf, offset + i * bar.size) for i in range(count)
+        ]
+        offset += count * bar.size
+    return Batch(records, bars)
+
+
+def index_path(path: Path) -> Path:
+    return path.with_name(path.name + '.idx')
+
+
+def read_frame(f: BinaryIO, offset: int) -> tuple[float, bytes] | None:
+    """
+    The frame at offset, None at the end of the log or at a torn frame
+    """
+    f.seek(offset)
+    head = f.read(frame_header.size)
+    if len(head) < frame_header.size:
+        return None
+    t, size, crc = frame_header.unpack(head)
+    payload = f.read(size)
+    if len(payload) < size or zlib.crc32(payload) != crc:
+        log.debug('Torn frame at %d', offset)
+        return None
+    return t, payload
+
+
+def scan_frames(path: Path, offset: int = 0) -> list[tuple[float, int]]:
+    """
+    (time, offset) of the complete frames from offset on
+    """
+    entries = []
+    with path.open('rb') as f:
+        while (frame := read_frame(f, offset)) is not None:
+            entries.append((frame[0], offset))
+            offset += frame_header.size + len(frame[1])
+    return entries
+
+
+def load_index(path: Path) -> list[tuple[float, int]]:
+    """
+    The time index of the log, rebuilt from the log if missing or behind
+    """
+    try:
+        data = index_path(path).read_bytes()
+    except FileNotFoundError:
+        data = b''
+    usable = len(data) - len(data) % index_entry.size
+    entries = list(index_entry.iter_unpack(data[:usable]))
+    # the frames written after the last index entry, if any
+    start = 0
+    if entries:
+        with path.open('rb') as f:
+            last = read_frame(f, entries[-1][1])
+        if last is None:
+            # the index is ahead of the log, start over
+            entries = []
+        else:
+            start = entries[-1][1] + frame_header.size + len(last[1])
+    tail = scan_frames(path, start) if path.exists() else []
+    if tail:
+        log.debug('Indexed %d more frames of %s', len(tail), path)
+    return entries + tail
+
+
+class Recorder:
+    """
+    Append the batches to the log, safe to call from the worker threads
+    """
+
+    def __init__(self, fname: str) -> None:
+        self.path = Path(fname)
+        self.lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.touch()
+        entries = load_index(self.path)
+        if entries:
+            _, offset = entries[-1]
+            with self.path.open('rb') as f:
+                frame = read_frame(f, offset)
+            assert frame is not None
+            self.end = offset + frame_header.size + len(frame[1])
+        else:
+            self.end = 0
+        # drop a torn frame and bring the index up to date
+        with self.path.open('r+b') as f:
+            f.truncate(self.end)
+        with index_path(self.path).open('wb') as f:
+            f.writelines(index_entry.pack(*e) for e in entries)
+        log.debug('Recording to %s from %d', self.path, self.end)
+        return
+
+    def append(self, batch: Batch, now: float | None = None) -> None:
+        """
+        Append the batch as a frame and its index entry
+        """
+        now = time.time() if now is None else now
+        payload = zlib.compress(encode_batch(batch), compression_level)
+        head = frame_header.pack(now, len(payload), zlib.crc32(payload))
+        with self.lock:
+            with self.path.open('ab') as f:
+                f.write(head + payload)
+            with index_path(self.path).open('ab') as f:
+                f.write(index_entry.pack(now, self.end))
+            self.end += len(head) + len(payload)
+        return
+
+
+class ReplayLog:
+    """
+    Read the recorded frames, optionally from some time on
+    """
+
+    def __init__(self, fname: str) -> None:
+        self.path = Path(fname)
+        self.index = load_index(self.path)
+        return
+
+    def __len__(self) -> int:
+        """Number of the recorded frames."""
+        return len(self.index)
+
+    def frames(self, since: float | None = None) -> Iterator[Frame]:
+        """
+        Frames recorded at or after since, all if None
+        """
+        start = 0 if since is None else bisect_left(self.index, (since, -1))
+        with self.path.open('rb') as f:
+            for _, offset in self.index[start:]:
+                frame = read_frame(f, offset)
+                if frame is None:
+                    return
+                t, payload = frame
+                yield Frame(t, decode_batch(zlib.decompress(payload)))
+        return
+
+    def symbols(self) -> set[str]:
+        """
+        All the recorded tickers
+        """
+        return {record[0] for frame in self.frames() for record in frame.batch.records}
+
+
+def replay(
+    log_file: ReplayLog, speed: float = 1.0, since: float | None = None
+) -> Iterator[Frame]:
+    """
+    Yield the frames keeping the recorded gaps between them divided by speed,
+    as fast as possible if speed is 0
+    """
+    start: tuple[float, float] | None = None
+    for frame in log_file.frames(since):
+        if start is None:
+            start = frame.time, time.monotonic()
+        elif speed > 0:
+            due = start[1] + (frame.time - start[0]) / speed
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        yield frame
+    return
+
+
+class Throughput:
+    """
+    Count the replayed frames and records
+    """
+
+    def __init__(self) -> None:
+        self.started = time.monotonic()
+        self.frames = 0
+        self.records = 0
+        return
+
+    def count(self, frames: Iterable[Frame]) -> Iterator[Frame]:
+        """
+        Pass the frames through counting them
+        """
+        for frame in frames:
+            self.frames += 1
+            self.records += len(frame.batch.records)
+            yield frame
+        return
+
+    def __str__(self) -> str:
+        """Summary of the replay so far."""
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        return (
+            f'Replayed {self.frames} frames, {self.records} records in '
+            f'{elapsed:.2f}s: {self.frames / elapsed:.1f} frames/s, '
+            f'{self.records / elapsed:.1f} records/s'
+        )
@@ -0,0 +1,107 @@
+"""
+Cells of the tickers table kept apart from the widget: a column of cells per
+header with a slot per symbol.  The widget renders only the rows in view from
+here, the updates of the other rows never reach it.
+"""
+
+from collections.abc import Sequence
+from typing import Any
+
+from rich.cells import cell_len
+
+
+def cell_text(value: object) -> str:
+    """
+    The text of the cell as shown in the table
+    """
+    if isinstance(value, float):
+        return f'{value:.2f}'
+    if value is None:
+        return ''
+    return str(value)
+
+
+class RowModel:
+    """
+    Columnar table cells, the rows are addressed by the symbol
+    """
+
+    def __init__(self, columns: Sequence[str]) -> None:
+        self.columns = list(columns)
+        self.column_index = {column: i for i, column in enumerate(self.columns)}
+        # cells per column, a row is the same slot in every column
+        self.cells: list[list[Any]] = [[] for _ in self.columns]
+        self.slots: dict[str, int] = {}
+        self.free: list[int] = []
+        # widest cell text per column, grows only
+        self.widths = [cell_len(column) for column in self.columns]
+        # bumped when a column gets wider
+        self.layout_version = 0
+        return
+
+    def __len__(self) -> int:
+        """Number of the rows."""
+        return len(self.slots)
+
+    def __contains__(self, symbol: object) -> bool:
+        """Tell if the symbol has a row."""
+        return symbol in self.slots
+
+    def fit(self, i: int, value: object) -> None:
+        width = cell_len(cell_text(value))
+        if width > self.widths[i]:
+            self.widths[i] = width
+            self.layout_version += 1
+        return
+
+    def set_row(self, symbol: str, cells: Sequence[Any]) -> None:
+        """
+        Add or replace the row of the symbol
+        """
+        slot = self.slots.get(symbol)
+        if slot is None:
+            if self.free:
+                slot = self.free.pop()
+            else:
+                slot = len(self.cells[0])
+                for column in self.cells:
+                    column.append(None)
+            self.slots[symbol] = slot
+        for i, value in enumerate(cells):
+            self.cells[i][slot] = value
+            self.fit(i, value)
+        return
+
+    def set(self, symbol: str, column: str, value: object) -> None:
+        """
+        Update a cell of the symbol row
+        """
+        i = self.column_index[column]
+        self.cells[i][self.slots[symbol]] = value
+        self.fit(i, value)
+        return
+
+    def get(self, symbol: str, column: str) -> Any:
+        return self.cells[self.column_index[column]][self.slots[symbol]]
+
+    def row(self, symbol: str) -> list[Any]:
+        slot = self.slots[symbol]
+        return [column[slot] for column in self.cells]
+
+    def remove(self, symbol: str) -> None:
+        slot = self.slots.pop(symbol, None)
+        if slot is None:
+            return
+        for column in self.cells:
+            column[slot] = None
+        self.free.append(slot)
+        return
+
+    def clear(self) -> None:
+        """
+        Drop all the rows, the column widths stay
+        """
+        self.cells = [[] for _ in self.columns]
+        self.slots = {}
+        self.free = []
+        return
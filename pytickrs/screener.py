@@ -0,0 +1,430 @@
+"""
+Screener: filter the tickers with expressions like
+
+    Change% < -3 and Price < High1y*0.8
+
+Column names are the table headers, case and spaces do not matter.
+The expression is compiled into closures over the parsed tree evaluating it
+for all the tickers at once: the numeric columns of the records are kept in
+a matrix, a slot per ticker, updated just for the changed records.
+"""
+
+import math
+import re
+from collections.abc import Callable, Iterable, Mapping
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from .tickers import headers, number
+
+
+class ScreenerError(ValueError):
+    """
+    Malformed screener expression
+    """
+
+
+def normalize(name: str) -> str:
+    return name.replace(' ', '').lower()
+
+
+column_indexes = {normalize(h): i for i, h in enumerate(headers)}
+
+token_re = re.compile(
+    r'\s*(?:(?P<num>\d+\.?\d*|\.\d+)|(?P<name>[A-Za-z_][A-Za-z0-9_]*(?:\s*%)?)'
+    r'|(?P<op><=|>=|==|!=|<|>|=|\+|-|\*|/|\(|\)))'
+)
+
+
+def divide(left: Any, right: Any) -> Any:
+    """
+    Division with NaN for the division by zero
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(right == 0, np.nan, np.true_divide(left, right))
+
+
+arithmetic_ops: dict[str, Callable[[Any, Any], Any]] = {
+    '+': np.add,
+    '-': np.subtract,
+    '*': np.multiply,
+    '/': divide,
+}
+comparison_ops: dict[str, Callable[[Any, Any], Any]] = {
+    '<': np.less,
+    '<=': np.less_equal,
+    '>': np.greater,
+    '>=': np.greater_equal,
+    '=': np.equal,
+    '==': np.equal,
+    '!=': np.not_equal,
+}
+
+# the columns matrix -> a value or a vector of values per slot
+Evaluator = Callable[[npt.NDArray[np.float64]], Any]
+
+
+#
+# Expression tree
+#
+class Num:
+    def __init__(self, value: float) -> None:
+        self.value = value
+
+    def eval(self) -> float | None:
+        return self.value
+
+
+class Col:
+    def __init__(self, index: int) -> None:
+        self.index = index
+
+
+class Arith:
+    def __init__(self, op: str, left: Any, right: Any) -> None:
+        self.op = op
+        self.left = left
+        self.right = right
+
+    def eval(self) -> float | None:
+        """
+        Value of the constant expression
+        """
+        left = self.left.eval()
+        right = self.right.eval()
+        if left is None or right is None:
+            return None
+        value = float(arithmetic_ops[self.op](left, right))
+        return None if math.isnan(value) else value
+
+
+class Compare:
+    def __init__(self, op: str, left: Any, right: Any) -> None:
+        self.op = op
+        self.left = left
+        self.right = right
+
+
+class And:
+    def __init__(self, items: list[Any]) -> None:
+        self.items = items
+
+
+class Or:
+    def __init__(self, items: list[Any]) -> None:
+        self.items = items
+
+
+class Not:
+    def __init__(self, item: Any) -> None:
+        self.item = item
+
+
+def is_constant(node: Any) -> bool:
+    if isinstance(node, Num):
+        return True
+    if isinstance(node, Arith):
+        return is_constant(node.left) and is_constant(node.right)
+    return False
+
+
+#
+# Parser
+#
+def tokenize(text: str) -> list[str]:
+    tokens: list[str] = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        m = token_re.match(text, pos)
+        if m is None or m.end() == pos:
+            raise ScreenerError(f'Unexpected {text[pos:].strip()!r}')
+        tokens.append(m.group(m.lastgroup or 0))
+        pos = m.end()
+    return tokens
+
+
+class Parser:
+    """
+    expr := conj ('or' conj)*
+    conj := neg ('and' neg)*
+    neg := 'not' neg | comparison | '(' expr ')'
+    comparison := sum op sum
+    sum := product (('+'|'-') product)*
+    product := unary (('*'|'/') unary)*
+    unary := '-' unary | number | column | '(' sum ')'
+    """
+
+    def __init__(self, text: str) -> None:
+        self.tokens = tokenize(text)
+        self.pos = 0
+
+    def peek(self) -> str | None:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def keyword(self, word: str) -> bool:
+        token = self.peek()
+        if token is not None and token.lower() == word:
+            self.pos += 1
+            return True
+        return False
+
+    def expect(self, token: str) -> None:
+        if self.peek() != token:
+            raise ScreenerError(f'Expected {token!r}')
+        self.pos += 1
+
+    def parse(self) -> Any:
+        node = self.expr()
+        if self.peek() is not None:
+            raise ScreenerError(f'Unexpected {self.peek()!r}')
+        return node
+
+    def expr(self) -> Any:
+        items = [self.conj()]
+        while self.keyword('or'):
+            items.append(self.conj())
+        return items[0] if len(items) == 1 else Or(items)
+
+    def conj(self) -> Any:
+        items = [self.neg()]
+        while self.keyword('and'):
+            items.append(self.neg())
+        return items[0] if len(items) == 1 else And(items)
+
+    def neg(self) -> Any:
+        if self.keyword('not'):
+            return Not(self.neg())
+        if self.peek() == '(':
+            # either a parenthesized condition or the start of arithmetic
+            start = self.pos
+            try:
+                return self.comparison()
+            except ScreenerError:
+                self.pos = start
+            self.expect('(')
+            node = self.expr()
+            self.expect(')')
+            return node
+        return self.comparison()
+
+    def comparison(self) -> Compare:
+        left = self.sum()
+        op = self.peek()
+        if op not in comparison_ops:
+            raise ScreenerError(
+                f'Expected a comparison after {self.tokens[self.pos - 1]!r}'
+            )
+        self.pos += 1
+        return Compare(op, left, self.sum())
+
+    def sum(self) -> Any:
+        node = self.product()
+        while self.peek() in ('+', '-'):
+            op = self.tokens[self.pos]
+            self.pos += 1
+            node = Arith(op, node, self.product())
+        return node
+
+    def product(self) -> Any:
+        node = self.unary()
+        while self.peek() in ('*', '/'):
+            op = self.tokens[self.pos]
+            self.pos += 1
+            node = Arith(op, node, self.unary())
+        return node
+
+    def unary(self) -> Any:
+        word = self.peek()
+        if word is None:
+            raise ScreenerError(f'Expected more after {self.tokens[-1]!r}')
+        self.pos += 1
+        if word == '-':
+            return Arith('-', Num(0.0), self.unary())
+        if word == '(':
+            node = self.sum()
+            self.expect(')')
+            return node
+        if word[0].isdigit() or word[0] == '.':
+            value = float(word)
+            if not math.isfinite(value):
+                raise ScreenerError(f'Number {word!r} is too large')
+            return Num(value)
+        index = column_indexes.get(normalize(word))
+        if index is None:
+            raise ScreenerError(f'Unknown column {word!r}')
+        return Col(index)
+
+
+def compile_expression(text: str) -> Any:
+    """
+    Parse the screener expression, None for a blank one
+    """
+    if not text.strip():
+        return None
+    return Parser(text).parse()
+
+
+#
+# Evaluation
+#
+def compile_value(node: Any) -> Evaluator:
+    """
+    Closure computing the arithmetic node, NaN where a value is missing
+    """
+    if is_constant(node):
+        value = node.eval()
+        constant = math.nan if value is None else value
+        return lambda _: constant
+    if isinstance(node, Col):
+        index = node.index
+        return lambda columns: columns[index]
+    assert isinstance(node, Arith)
+    op = arithmetic_ops[node.op]
+    left = compile_value(node.left)
+    right = compile_value(node.right)
+    return lambda columns: op(left(columns), right(columns))
+
+
+def compile_condition(node: Any) -> Evaluator:
+    """
+    Closure computing the condition node as a vector of booleans
+    """
+    if isinstance(node, Compare):
+        op = comparison_ops[node.op]
+        left = compile_value(node.left)
+        right = compile_value(node.right)
+        if node.op != '!=':
+            # a comparison involving NaN is false already
+            return lambda columns: op(left(columns), right(columns))
+
+        def not_equal(columns: npt.NDArray[np.float64]) -> Any:
+            a = left(columns)
+            b = right(columns)
+            return op(a, b) & ~np.isnan(a) & ~np.isnan(b)
+
+        return not_equal
+    if isinstance(node, And | Or):
+        items = [compile_condition(item) for item in node.items]
+        combine = np.logical_and if isinstance(node, And) else np.logical_or
+
+        def combined(columns: npt.NDArray[np.float64]) -> Any:
+            result = items[0](columns)
+            for item in items[1:]:
+                result = combine(result, item(columns))
+            return result
+
+        return combined
+    assert isinstance(node, Not)
+    item = compile_condition(node.item)
+    return lambda columns: np.logical_not(item(columns))
+
+
+class Screener:
+    """
+    Select the symbols matching an expression in the records snapshot.
+    The columns are synced with the records on demand, only the records
+    passed to invalidate() are read again.
+    """
+
+    def __init__(self, records: Mapping[str, tuple], capacity: int = 64) -> None:
+        self.records = records
+        # columns x slots, NaN for the missing numbers
+        self.columns = np.full((len(headers), capacity), np.nan)
+        self.symbols = np.empty(capacity, dtype=object)
+        self.slots: dict[str, int] = {}
+        # symbols to read again, None for all
+        self.dirty: set[str] | None = None
+        # the last expression and its closure
+        self.compiled: tuple[Any, Evaluator] | None = None
+        return
+
+    def invalidate(self, symbols: Iterable[str] | None = None) -> None:
+        """
+        Call when the records of the symbols change, or all of them if None
+        """
+        if symbols is None or self.dirty is None:
+            self.dirty = None
+        else:
+            self.dirty.update(symbols)
+        return
+
+    def sync(self) -> None:
+        """
+        Bring the columns up to date with the records
+        """
+        if self.dirty is None:
+            self.slots = {}
+            self.columns[:] = np.nan
+            dirty: Iterable[str] = self.records.keys()
+        else:
+            dirty = self.dirty
+        for symbol in dirty:
+            record = self.records.get(symbol)
+            if record is None:
+                self.remove(symbol)
+            else:
+                self.store(symbol, record)
+        self.dirty = set()
+        return
+
+    def store(self, symbol: str, record: tuple) -> None:
+        slot = self.slots.get(symbol)
+        if slot is None:
+            slot = len(self.slots)
+            if slot == len(self.symbols):
+                self.grow()
+            self.slots[symbol] = slot
+            self.symbols[slot] = symbol
+        self.columns[:, slot] = [
+            math.nan if (v := number(value)) is None else v for value in record
+        ]
+        return
+
+    def remove(self, symbol: str) -> None:
+        # move the last slot into the freed one to keep the slots dense
+        slot = self.slots.pop(symbol, None)
+        if slot is None:
+            return
+        last = len(self.slots)
+        if slot != last:
+            moved = self.symbols[last]
+            self.columns[:, slot] = self.columns[:, last]
+            self.symbols[slot] = moved
+            self.slots[moved] = slot
+        self.columns[:, last] = np.nan
+        self.symbols[last] = None
+        return
+
+    def grow(self) -> None:
+        capacity = 2 * len(self.symbols)
+        columns = np.full((len(headers), capacity), np.nan)
+        columns[:, : len(self.symbols)] = self.columns
+        self.columns = columns
+        symbols = np.empty(capacity, dtype=object)
+        symbols[: len(self.symbols)] = self.symbols
+        self.symbols = symbols
+        return
+
+    def evaluator(self, node: Any) -> Evaluator:
+        if self.compiled is None or self.compiled[0] is not node:
+            self.compiled = node, compile_condition(node)
+        return self.compiled[1]
+
+    def select(self, node: Any, universe: set[str]) -> set[str]:
+        """
+        Symbols from universe matching the expression node
+        """
+        if node is None:
+            return set(universe)
+        self.sync()
+        evaluate = self.evaluator(node)
+        n = len(self.slots)
+        mask = np.broadcast_to(evaluate(self.columns[:, :n]), (n,))
+        found = universe.intersection(self.symbols[np.flatnonzero(mask)].tolist())
+        if evaluate(np.full((len(headers), 1), np.nan)).any():
+            # matches the symbols without a record too, e.g. a negation
+            found |= universe - self.slots.keys()
+        return found
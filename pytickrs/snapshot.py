@@ -0,0 +1,94 @@
+"""
+Last known ticker records kept in the local cache, so the TUI can show them
+right away while fresh ones are fetched.
+"""
+
+import json
+import os
+import time
+from collections.abc import Mapping
+from pathlib import Path
+
+from .log import setup_logging
+from .tickers import headers
+
+log = setup_logging(__name__)
+
+
+def cache_dir() -> Path:
+    """
+    The local cache of pytickrs, e.g. ~/.cache/pytickrs
+    """
+    cache = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(cache) / 'pytickrs'
+
+
+def snapshot_path() -> Path:
+    """
+    Where the snapshot is kept, e.g. ~/.cache/pytickrs/snapshot.json
+    """
+    return cache_dir() / 'snapshot.json'
+
+
+def load_snapshot(path: Path | None = None) -> dict[str, tuple[float, tuple]]:
+    """
+    Returns symbol -> (fetched at, record), empty if there is no usable snapshot
+    """
+    path = path or snapshot_path()
+    try:
+        with path.open(encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as err:
+        log.warning('Ignoring snapshot %s: %s', path, err)
+        return {}
+    if data.get('headers') != list(headers):
+        # saved by a version with the different columns
+        return {}
+    return {
+        symbol: (fetched_at, tuple(record))
+        for symbol, (fetched_at, record) in data.get('records', {}).items()
+    }
+
+
+def save_snapshot(
+    records: Mapping[str, tuple],
+    fetched_at: Mapping[str, float],
+    path: Path | None = None,
+) -> None:
+    """
+    Merge the records into the snapshot, replace the file atomically
+    """
+    path = path or snapshot_path()
+    snapshot = load_snapshot(path)
+    now = time.time()
+    for symbol, record in records.items():
+        snapshot[symbol] = (fetched_at.get(symbol, now), record)
+    data = {
+        'headers': list(headers),
+        'records': {
+            symbol: [fetched, list(record)]
+            for symbol, (fetched, record) in snapshot.items()
+        },
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f'.{os.getpid()}.tmp')
+    with tmp.open('w', encoding='utf-8') as f:
+        json.dump(data, f, separators=(',', ':'))
+    tmp.replace(path)
+    return
+
+
+def format_age(seconds: float) -> str:
+    """
+    Human friendly age, e.g. 45s, 12m, 3h, 2d
+    """
+    seconds = max(seconds, 0)
+    if seconds < 60:
+        return f'{int(seconds)}s'
+    if seconds < 3600:
+        return f'{int(seconds // 60)}m'
+    if seconds < 86400:
+        return f'{int(seconds // 3600)}h'
+    return f'{int(seconds // 86400)}d'
@@ -0,0 +1,123 @@
+"""
+Maintained sort order of the table rows.
+
+Rows are kept sorted by a typed key: numbers before strings, nulls last in
+either direction.  When a value changes only that row is repositioned.
+"""
+
+import math
+from bisect import bisect_left, insort
+from collections.abc import Mapping
+from functools import total_ordering
+from typing import Any
+
+
+@total_ordering
+class Descending:
+    """
+    Reverse the ordering of the wrapped value
+    """
+
+    __slots__ = ('value',)
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+    def __eq__(self, other: object) -> bool:
+        """Equal if the wrapped values are equal"""
+        return isinstance(other, Descending) and self.value == other.value
+
+    def __lt__(self, other: 'Descending') -> bool:
+        """Less if the wrapped value is greater"""
+        return bool(other.value < self.value)
+
+    def __hash__(self) -> int:
+        """Hash of the wrapped value"""
+        return hash(self.value)
+
+
+def sort_key(value: Any, *, reverse: bool = False) -> tuple:
+    """
+    Typed sort key, nulls sort last regardless of the direction
+    """
+    if value is None or value in ('', '.'):
+        return (2,)
+    if isinstance(value, int | float):
+        if math.isnan(value):
+            return (2,)
+        return (0, -value if reverse else value)
+    s = str(value)
+    return (1, Descending(s) if reverse else s)
+
+
+class SortOrder:
+    """
+    Symbols sorted by the values in the column, ties are broken by the symbol
+    """
+
+    def __init__(self, column: int = 0, *, reverse: bool = False) -> None:
+        self.column = column
+        self.reverse = reverse
+        # sorted list of (sort key, symbol)
+        self.entries: list[tuple[tuple, str]] = []
+        self.by_symbol: dict[str, tuple[tuple, str]] = {}
+        return
+
+    def __len__(self) -> int:
+        """Number of the sorted symbols"""
+        return len(self.entries)
+
+    def __contains__(self, symbol: str) -> bool:
+        """Is the symbol sorted here"""
+        return symbol in self.by_symbol
+
+    def reset(self, values: Mapping[str, Any]) -> None:
+        """
+        Sort from scratch, values: symbol -> value in the sort column
+        """
+        self.by_symbol = {
+            symbol: (sort_key(value, reverse=self.reverse), symbol)
+            for symbol, value in values.items()
+        }
+        self.entries = sorted(self.by_symbol.values())
+        return
+
+    def symbols(self, start: int = 0, stop: int | None = None) -> list[str]:
+        return [symbol for _, symbol in self.entries[start:stop]]
+
+    def index(self, symbol: str) -> int:
+        return bisect_left(self.entries, self.by_symbol[symbol])
+
+    def add(self, symbol: str, value: Any) -> int:
+        """
+        Add the symbol, returns its position
+        """
+        entry = (sort_key(value, reverse=self.reverse), symbol)
+        self.by_symbol[symbol] = entry
+        insort(self.entries, entry)
+        return bisect_left(self.entries, entry)
+
+    def remove(self, symbol: str) -> int:
+        """
+        Remove the symbol, returns its former position
+        """
+        entry = self.by_symbol.pop(symbol)
+        i = bisect_left(self.entries, entry)
+        del self.entries[i]
+        return i
+
+    def update(self, symbol: str, value: Any) -> tuple[int, int]:
+        """
+        Reposition the symbol for the new value, returns old and new positions
+        """
+        entry = (sort_key(value, reverse=self.reverse), symbol)
+        old_entry = self.by_symbol[symbol]
+        if entry == old_entry:
+            i = bisect_left(self.entries, entry)
+            return i, i
+        i = bisect_left(self.entries, old_entry)
+        del self.entries[i]
+        j = bisect_left(self.entries, entry)
+        self.entries.insert(j, entry)
+        self.by_symbol[symbol] = entry
+        return i, j
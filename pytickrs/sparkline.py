@@ -0,0 +1,106 @@
+"""
+Intraday sparklines: the bars per ticker are cached and only the new ones are
+appended, the rendered glyphs are cached until the bars change.
+"""
+
+from collections.abc import Iterable, Sequence
+
+glyphs = '▁▂▃▄▅▆▇█'
+# bar interval requested when the sparklines are shown
+sparkline_interval = '5m'
+# the column header
+sparkline_header = 'Trend'
+# seconds without bars taken as the end of a session, longer than the lunch
+# breaks of e.g. Tokyo and Hong Kong, shorter than a night
+session_gap = 4 * 3600
+
+
+def sparkline(values: Sequence[float], width: int) -> str:
+    """
+    Render up to width glyphs for the values
+    """
+    n = len(values)
+    if n == 0:
+        return ''
+    if n > width:
+        # sample evenly, keep the first and the last values
+        step = (n - 1) / (width - 1) if width > 1 else n
+        values = [values[round(i * step)] for i in range(width)]
+    lo = min(values)
+    span = max(values) - lo
+    if span == 0:
+        return glyphs[len(glyphs) // 2] * len(values)
+    top = len(glyphs) - 1
+    return ''.join(glyphs[round((v - lo) / span * top)] for v in values)
+
+
+class Sparklines:
+    """
+    Cached bars and the rendered sparklines per ticker
+    """
+
+    def __init__(self, width: int = 20) -> None:
+        self.width = width
+        self.closes: dict[str, list[float]] = {}
+        self.last_time: dict[str, int] = {}
+        self.rendered: dict[str, str] = {}
+        return
+
+    def since(self) -> dict[str, int]:
+        """
+        Time of the last cached bar per ticker, to fetch only it and the newer ones
+        """
+        return dict(self.last_time)
+
+    def append(self, symbol: str, bars: Iterable[tuple[int, float]]) -> bool:
+        """
+        Append the bars newer than the cached ones, the bar at the time of the
+        last cached one replaces it, returns True if any changed
+        """
+        closes = self.closes.setdefault(symbol, [])
+        last = self.last_time.get(symbol, 0)
+        changed = False
+        for t, close in bars:
+            if t < last:
+                continue
+            if t == last and closes:
+                # the current bar is still forming
+                if closes[-1] != close:
+                    closes[-1] = close
+                    changed = True
+                continue
+            if t - last >= session_gap:
+                # a new session, which may well start on the last UTC date
+                closes.clear()
+            closes.append(close)
+            last = t
+            changed = True
+        if changed:
+            self.last_time[symbol] = last
+            self.rendered.pop(symbol, None)
+        return changed
+
+    def remove(self, symbol: str) -> None:
+        self.closes.pop(symbol, None)
+        self.last_time.pop(symbol, None)
+        self.rendered.pop(symbol, None)
+        return
+
+    def render(self, symbol: str) -> str:
+        """
+        Sparkline for the ticker, rebuilt only if the bars have changed
+        """
+        text = self.rendered.get(symbol)
+        if text is None:
+            text = sparkline(self.closes.get(symbol, []), self.width)
+            self.rendered[symbol] = text
+        return text
+
+    def trend(self, symbol: str) -> float | None:
+        """
+        Relative change since the first bar of the session
+        """
+        closes = self.closes.get(symbol)
+        if not closes or not closes[0]:
+            return None
+        return closes[-1] / closes[0] - 1
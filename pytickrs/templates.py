@@ -0,0 +1,73 @@
+"""
+Jinja environment for the details template.  The compiled templates are kept
+on disk, e.g. in ~/.cache/pytickrs/jinja, so a start does not compile them
+again unless the template file has changed.
+"""
+
+from pathlib import Path
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+from jinja2.bccache import Bucket
+
+from .formatters import format_date, format_num, is_defined
+from .log import setup_logging
+from .snapshot import cache_dir
+
+log = setup_logging(__name__)
+
+
+class MtimeBytecodeCache(FileSystemBytecodeCache):
+    """
+    Bytecode cache telling a changed template by the modification time and
+    size of its file instead of hashing the source
+    """
+
+    def get_bucket(
+        self,
+        environment: Environment,
+        name: str,
+        filename: str | None,
+        source: str,
+    ) -> Bucket:
+        """Return the cache bucket for the template."""
+        key = self.get_cache_key(name, filename)
+        try:
+            st = Path(filename).stat() if filename is not None else None
+        except OSError:
+            st = None
+        if st is None:
+            checksum = self.get_source_checksum(source)
+        else:
+            checksum = f'{st.st_mtime_ns}-{st.st_size}'
+        bucket = Bucket(environment, key, checksum)
+        self.load_bytecode(bucket)
+        return bucket
+
+
+def bytecode_cache(directory: Path | None = None) -> MtimeBytecodeCache | None:
+    """
+    The on-disk bytecode cache, None if the directory is not usable
+    """
+    directory = directory or cache_dir() / 'jinja'
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+    except OSError as err:
+        log.warning('Not caching the templates: %s', err)
+        return None
+    return MtimeBytecodeCache(str(directory))
+
+
+def template_environment(directory: Path | None = None) -> Environment:
+    """
+    Environment loading the templates relative to the current directory,
+    with the custom global functions for use in the template
+    """
+    env = Environment(
+        autoescape=True,
+        loader=FileSystemLoader(''),
+        bytecode_cache=bytecode_cache(directory),
+    )
+    env.globals['format_num'] = format_num
+    env.globals['format_date'] = format_date
+    env.globals['is_defined'] = is_defined
+    return env
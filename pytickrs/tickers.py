@@ -1,4 +1,6 @@
+import math
 from pathlib import Path
+from typing import Any
 
 import yfinance as yf
 
@@ -28,6 +30,17 @@ header2ticker_info = {
 }
 
 
+def number(value: object) -> float | None:
+    """
+    The value as a float, None if not a number
+    """
+    if isinstance(value, bool) or not isinstance(value, int | float):
+        return None
+    if math.isnan(value):
+        return None
+    return float(value)
+
+
 def load_tickers(fname: str) -> set[str]:
     """
     Load tickers from file fname
@@ -38,25 +51,42 @@ def load_tickers(fname: str) -> set[str]:
         for line1 in f:
             line = line1.strip()
             if line and not line.startswith('#'):
-                tickers.add(line)
+                tickers.add(line.upper())
     return tickers
 
 
 def analyze_ticker(ticker: yf.Ticker) -> list[str]:
-    recommendations = []
+    return analyze_info(ticker.info)
+
+
+def year_range(info: dict[str, Any]) -> tuple[float, float] | None:
+    """
+    The 52-week low and high, None if not known or degenerate
+    """
+    low = number(info.get('fiftyTwoWeekLow'))
+    high = number(info.get('fiftyTwoWeekHigh'))
+    if low is None or high is None or high <= low:
+        # e.g. a delisted or a newly listed symbol
+        return None
+    return low, high
+
+
+def analyze_info(info: dict[str, Any]) -> list[str]:
+    recommendations: list[str] = []
     high_low_proximity_percent = 20
-    info = ticker.info
-    fifty_two_week_high = info.get('fiftyTwoWeekHigh')
     # currentPrice = info.get('currentPrice')
     # the highest price a buyer is ready to pay
-    bid = info.get('bid')
+    bid = number(info.get('bid'))
     # the lowest price a seller is ready to accept
-    ask = info.get('ask')
-    fifty_two_week_low = info.get('fiftyTwoWeekLow')
-    dayLow = info.get('dayLow')
-    dayHigh = info.get('dayHigh')
+    ask = number(info.get('ask'))
+    dayLow = number(info.get('dayLow'))
+    dayHigh = number(info.get('dayHigh'))
+    yearly = year_range(info)
+    if yearly is None or bid is None or ask is None:
+        # not enough data, e.g. a delisted or an exotic symbol
+        return recommendations
+    fifty_two_week_low, fifty_two_week_high = yearly
     yearly_range = fifty_two_week_high - fifty_two_week_low
-    assert yearly_range > 0
     if dayHigh == fifty_two_week_high or bid > fifty_two_week_high:
         recommendations.append('sell, 1y high')
     elif bid > fifty_two_week_high - (yearly_range * high_low_proximity_percent / 100):
@@ -66,3 +96,14 @@ def analyze_ticker(ticker: yf.Ticker) -> list[str]:
     elif ask < fifty_two_week_low + (yearly_range * high_low_proximity_percent / 100):
         recommendations.append('buy, close to low')
     return recommendations
+
+
+def info_record(symbol: str, info: dict[str, Any]) -> tuple:
+    """
+    Compact record of the ticker info, one value per header
+    """
+    return (
+        symbol,
+        *(info.get(v) for v in header2ticker_info.values()),
+        '; '.join(analyze_info(info)),
+    )
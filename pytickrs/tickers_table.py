@@ -0,0 +1,372 @@
+"""
+Table of the tickers rendering just the rows in view.
+
+The cells live in the row model and the row order in the sort order, the
+widget keeps neither.  Only the rows in the viewport plus a few above and
+below it are rendered into strips, so mounting the table and scrolling it
+cost the same for 20 tickers as for 20,000.  An update to a row out of view
+changes the model alone.
+"""
+
+from typing import ClassVar
+
+from rich.cells import cell_len
+from rich.segment import Segment
+from rich.style import Style
+from textual import events
+from textual.binding import Binding, BindingType
+from textual.geometry import Size
+from textual.message import Message
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+
+from .row_model import RowModel, cell_text
+from .sort_order import SortOrder
+
+# rows rendered ahead above and below the viewport
+overscan_rows = 8
+# blank cells around the cell text
+cell_padding = 1
+
+
+class TickersTable(ScrollView, can_focus=True):
+    """
+    Row cursor table over the row model in the sort order
+    """
+
+    DEFAULT_CSS = """
+    TickersTable {
+        background: $surface;
+        color: $foreground;
+        height: auto;
+        max-height: 100%;
+
+        &:focus {
+            background-tint: $foreground 5%;
+            & > .tickers-table--cursor {
+                background: $block-cursor-background;
+                color: $block-cursor-foreground;
+                text-style: $block-cursor-text-style;
+            }
+            & > .tickers-table--header {
+                background-tint: $foreground 5%;
+            }
+        }
+        &:dark > .tickers-table--even-row {
+            background: $surface-darken-1 40%;
+        }
+        & > .tickers-table--header {
+            text-style: bold;
+            background: $panel;
+            color: $foreground;
+        }
+        &:ansi > .tickers-table--header {
+            background: ansi_bright_blue;
+            color: ansi_default;
+        }
+        & > .tickers-table--even-row {
+            background: $surface-lighten-1 50%;
+        }
+        & > .tickers-table--cursor {
+            background: $block-cursor-blurred-background;
+            color: $block-cursor-blurred-foreground;
+            text-style: $block-cursor-blurred-text-style;
+        }
+    }
+    """
+
+    COMPONENT_CLASSES: ClassVar[set[str]] = {
+        'tickers-table--header',
+        'tickers-table--cursor',
+        'tickers-table--even-row',
+    }
+
+    BINDINGS: ClassVar[list[BindingType]] = [
+        Binding('up', 'cursor_up', 'Cursor up', show=False),
+        Binding('down', 'cursor_down', 'Cursor down', show=False),
+        Binding('pageup', 'page_up', 'Page up', show=False),
+        Binding('pagedown', 'page_down', 'Page down', show=False),
+        Binding('home', 'cursor_home', 'First row', show=False),
+        Binding('end', 'cursor_end', 'Last row', show=False),
+    ]
+
+    class RowHighlighted(Message):
+        """
+        Posted when the cursor moves to another row
+        """
+
+        def __init__(self, table: 'TickersTable', symbol: str) -> None:
+            super().__init__()
+            self.table = table
+            self.symbol = symbol
+            return
+
+        @property
+        def control(self) -> 'TickersTable':
+            return self.table
+
+    class HeaderSelected(Message):
+        """
+        Posted when a column header is clicked
+        """
+
+        def __init__(self, table: 'TickersTable', column_index: int) -> None:
+            super().__init__()
+            self.table = table
+            self.column_index = column_index
+            return
+
+        @property
+        def control(self) -> 'TickersTable':
+            return self.table
+
+    def __init__(
+        self,
+        model: RowModel,
+        order: SortOrder,
+        *,
+        overscan: int = overscan_rows,
+        name: str | None = None,
+        id: str | None = None,
+        classes: str | None = None,
+    ) -> None:
+        super().__init__(name=name, id=id, classes=classes)
+        self.model = model
+        self.order = order
+        self.overscan = overscan
+        self.cursor_row = 0
+        # the symbol last reported highlighted, the cursor follows it
+        self.highlighted: str | None = None
+        # symbol -> the unstyled row, for the rows around the viewport only
+        self.strips: dict[str, Strip] = {}
+        # column start offsets and the total width, as of the model layout
+        self.layout_version = -1
+        self.offsets: list[int] = []
+        self.header_strip = Strip.blank(0)
+        return
+
+    @property
+    def row_count(self) -> int:
+        return len(self.order)
+
+    def cursor_symbol(self) -> str | None:
+        """
+        The symbol of the row under the cursor, None if the table is empty
+        """
+        if self.cursor_row < len(self.order):
+            return self.order.entries[self.cursor_row][1]
+        return None
+
+    def get_row(self, symbol: str) -> list:
+        """
+        Cells of the symbol row
+        """
+        return self.model.row(symbol)
+
+    def check_layout(self) -> None:
+        """
+        Re-measure the columns once the model has widened any of them
+        """
+        if self.layout_version == self.model.layout_version:
+            return
+        self.layout_version = self.model.layout_version
+        self.offsets = [0]
+        for width in self.model.widths:
+            self.offsets.append(self.offsets[-1] + width + 2 * cell_padding)
+        self.header_strip = self.render_cells(self.model.columns)
+        # all the rows are re-rendered to the new widths
+        self.strips.clear()
+        self.update_size()
+        self.refresh()
+        return
+
+    def update_size(self) -> None:
+        self.virtual_size = Size(self.offsets[-1], len(self.order) + 1)
+        return
+
+    def render_cells(self, cells: list) -> Strip:
+        pad = ' ' * cell_padding
+        parts = []
+        for value, width in zip(cells, self.model.widths, strict=True):
+            text = cell_text(value)
+            parts.append(pad + text + ' ' * (width - cell_len(text)) + pad)
+        return Strip([Segment(''.join(parts))], self.offsets[-1])
+
+    def row_strip(self, symbol: str) -> Strip:
+        strip = self.strips.get(symbol)
+        if strip is None:
+            strip = self.render_cells(self.model.row(symbol))
+            self.strips[symbol] = strip
+        return strip
+
+    def window(self) -> tuple[int, int]:
+        """
+        Rows to keep rendered: the viewport and the overscan around it
+        """
+        top = self.scroll_offset.y
+        start = max(top - self.overscan, 0)
+        stop = min(
+            top + self.scrollable_content_region.height + self.overscan, len(self.order)
+        )
+        return start, stop
+
+    def materialize(self) -> None:
+        """
+        Render the rows around the viewport, drop the rest
+        """
+        self.check_layout()
+        start, stop = self.window()
+        strips = {}
+        for symbol in self.order.symbols(start, stop):
+            strips[symbol] = self.row_strip(symbol)
+        self.strips = strips
+        return
+
+    def render_line(self, y: int) -> Strip:
+        self.check_layout()
+        scroll_x, scroll_y = self.scroll_offset
+        width = self.scrollable_content_region.width
+        base = self.rich_style
+        if y == 0:
+            # the header stays put
+            style = self.get_component_rich_style('tickers-table--header')
+            strip = self.header_strip
+        else:
+            row = scroll_y + y - 1
+            if row >= len(self.order):
+                return Strip.blank(width, base)
+            strip = self.row_strip(self.order.entries[row][1])
+            if row == self.cursor_row:
+                style = self.get_component_rich_style('tickers-table--cursor')
+            elif row % 2:
+                style = self.get_component_rich_style('tickers-table--even-row')
+            else:
+                style = Style()
+        return strip.crop_extend(scroll_x, scroll_x + width, None).apply_style(
+            base + style
+        )
+
+    def watch_scroll_y(self, old_value: float, new_value: float) -> None:
+        super().watch_scroll_y(old_value, new_value)
+        self.materialize()
+        return
+
+    def on_resize(self, _event: events.Resize) -> None:
+        self.materialize()
+        return
+
+    def refresh_row(self, row: int) -> None:
+        self.refresh_line(row + 1)
+        return
+
+    def refresh_symbol(self, symbol: str) -> None:
+        """
+        The cells of the symbol changed in the model, redraw the row if shown
+        """
+        if self.strips.pop(symbol, None) is None:
+            # not rendered, thus not in view either
+            return
+        row = self.order.index(symbol)
+        if self.layout_version != self.model.layout_version:
+            self.check_layout()
+        else:
+            self.refresh_row(row)
+        return
+
+    def rows_changed(self, start: int = 0, stop: int | None = None) -> None:
+        """
+        The rows from start to stop were added, removed or moved in the order
+        """
+        self.check_layout()
+        self.update_size()
+        # the cursor stays on its symbol as the rows move
+        row = self.cursor_row
+        if self.highlighted is not None and self.highlighted in self.order:
+            row = self.order.index(self.highlighted)
+        row = max(min(row, len(self.order) - 1), 0)
+        if row != self.cursor_row:
+            self.refresh_row(self.cursor_row)
+            self.cursor_row = row
+            self.refresh_row(row)
+        top = self.scroll_offset.y
+        bottom = top + self.scrollable_content_region.height
+        if stop is None:
+            stop = max(bottom, start)
+        if start < bottom and stop > top:
+            self.refresh()
+        self.materialize()
+        self.check_highlighted()
+        return
+
+    def set_order(self, order: SortOrder) -> None:
+        """
+        Show the rows in another order
+        """
+        self.order = order
+        self.rows_changed()
+        return
+
+    def check_highlighted(self) -> None:
+        symbol = self.cursor_symbol()
+        if symbol is not None and symbol != self.highlighted:
+            self.highlighted = symbol
+            self.post_message(self.RowHighlighted(self, symbol))
+        return
+
+    def move_cursor(self, *, row: int) -> None:
+        """
+        Move the cursor to the row and scroll it into view
+        """
+        row = max(min(row, len(self.order) - 1), 0)
+        if row != self.cursor_row:
+            self.refresh_row(self.cursor_row)
+            self.cursor_row = row
+            self.refresh_row(row)
+        height = self.scrollable_content_region.height - 1
+        top = self.scroll_offset.y
+        if row < top:
+            self.scroll_to(y=row, animate=False, immediate=True)
+        elif height > 0 and row >= top + height:
+            self.scroll_to(y=row - height + 1, animate=False, immediate=True)
+        self.check_highlighted()
+        return
+
+    def action_cursor_up(self) -> None:
+        self.move_cursor(row=self.cursor_row - 1)
+        return
+
+    def action_cursor_down(self) -> None:
+        self.move_cursor(row=self.cursor_row + 1)
+        return
+
+    def action_page_up(self) -> None:
+        page = max(self.scrollable_content_region.height - 1, 1)
+        self.move_cursor(row=self.cursor_row - page)
+        return
+
+    def action_page_down(self) -> None:
+        page = max(self.scrollable_content_region.height - 1, 1)
+        self.move_cursor(row=self.cursor_row + page)
+        return
+
+    def action_cursor_home(self) -> None:
+        self.move_cursor(row=0)
+        return
+
+    def action_cursor_end(self) -> None:
+        self.move_cursor(row=len(self.order) - 1)
+        return
+
+    def on_click(self, event: events.Click) -> None:
+        offset = event.get_content_offset(self)
+        if offset is None:
+            return
+        if offset.y == 0:
+            x = offset.x + self.scroll_offset.x
+            for i, end in enumerate(self.offsets[1:]):
+                if x < end:
+                    self.post_message(self.HeaderSelected(self, i))
+                    break
+            return
+        self.move_cursor(row=self.scroll_offset.y + offset.y - 1)
+        return
@@ -1,24 +1,50 @@
 import logging
-from typing import ClassVar
-from datetime import datetime
+import time
+from typing import Any, ClassVar
 
 import yfinance as yf
-from jinja2 import Environment, FileSystemLoader, Template
-from jinja2.exceptions import TemplateSyntaxError, UndefinedError
+from jinja2 import Template
+from jinja2.exceptions import TemplateSyntaxError
 from textual import work
 from textual.app import App, ComposeResult
 from textual.containers import Horizontal
 from textual.message import Message
-from textual.widgets import DataTable, Footer, Header, Label, MarkdownViewer
-from textual.worker import Worker
+from textual.widgets import Footer, Header, Input, Label
+from textual.worker import Worker, WorkerState, get_current_worker
 
+from .alerts import Alert, AlertBook, run_alert_command
+from .details_pane import DetailsPane
+from .fetch import Batch, fetch_batches, fetch_tickers
 from .log import eprint, setup_logging
+from .portfolio import Portfolio, portfolio_headers
+from .publish import publish_snapshot
+from .recorder import Recorder, ReplayLog, Throughput, replay
+from .row_model import RowModel
+from .screener import Screener, ScreenerError, compile_expression
+from .snapshot import format_age, load_snapshot, save_snapshot
+from .sort_order import SortOrder
+from .sparkline import Sparklines, sparkline_header
 from .split_pane import SplitContainer
-from .tickers import analyze_ticker, header2ticker_info, headers
+from .templates import template_environment
+from .tickers import headers, load_tickers
+from .tickers_table import TickersTable
+from .watch import FileWatcher
 
 log: logging.Logger | None = None
 
+# how often to check the tickers file for changes, secs
+watch_interval = 1.0
+# re-populate the table instead of adding/removing more rows than this
+max_row_changes = 32
+# the column with the age of the rows restored from the snapshot
+age_header = 'Age'
+# how often to refresh the age of the rows, secs
+age_interval = 5.0
+
 CSS = """
+Input#screener {
+    dock: top;
+}
 Horizontal#footer-outer {
     height: 1;
     dock: bottom;
@@ -41,6 +67,45 @@ class TaskCompleteMessage(Message):
     """
 
 
+class RecordsMessage(Message):
+    """
+    A message carrying a batch of the fetched ticker records and bars.
+    fetched_at: the time of a replayed batch, None for now.
+    """
+
+    def __init__(
+        self,
+        records: list[tuple],
+        bars: dict[str, list[tuple[int, float]]] | None,
+        fetched_at: float | None = None,
+    ) -> None:
+        super().__init__()
+        self.records = records
+        self.bars = bars or {}
+        self.fetched_at = fetched_at
+
+
+class ReplayCompleteMessage(Message):
+    """
+    A message indicating all the recorded batches are replayed.
+    """
+
+    def __init__(self, throughput: Throughput) -> None:
+        super().__init__()
+        self.throughput = throughput
+
+
+class DetailsMessage(Message):
+    """
+    A message carrying the info of the ticker for the details pane.
+    """
+
+    def __init__(self, symbol: str, info: dict) -> None:
+        super().__init__()
+        self.symbol = symbol
+        self.info = info
+
+
 class TheApp(App):
     """
     A simple Textual app using yfinance to retrieve and display stock data.
@@ -48,10 +113,11 @@ class TheApp(App):
     2. Display tickers in a table
     3. Update ticker data on user command
     4. Sort table by column on header click
-    5. Increase/decrease font size on user command
-    6. Quit app on user command
-    7. Log actions to a file
-    8. Use yfinance to fetch ticker data
+    5. Filter table rows with the screener expression
+    6. Increase/decrease font size on user command
+    7. Quit app on user command
+    8. Log actions to a file
+    9. Use yfinance to fetch ticker data
     """
 
     TITLE = 'Stock Analyzer'
@@ -61,18 +127,69 @@ class TheApp(App):
     BINDINGS: ClassVar = [
         ('q', 'quit_app', 'Quit'),
         ('u', 'update', 'Update'),
+        ('/', 'screener', 'Screener'),
         ('ctrl+plus', 'increase_font_size', 'Increase Font Size'),
         ('ctrl+minus', 'decrease_font_size', 'Decrease Font Size'),
     ]
 
-    def __init__(self, tickers: set[str], details_template: Template) -> None:
+    def __init__(
+        self,
+        tickers: set[str],
+        details_template: Template,
+        *,
+        workers: int = 0,
+        tickers_paths: list[str] | None = None,
+        sparkline: bool = False,
+        alerts: AlertBook | None = None,
+        alert_command: str | None = None,
+        publish: str | None = None,
+        recorder: Recorder | None = None,
+        replay_log: ReplayLog | None = None,
+        speed: float = 1.0,
+        portfolio: Portfolio | None = None,
+    ) -> None:
         super().__init__()
-        self.column_index_selected = 0
-        self.column_sort_reverse = False
+        # rows are sorted by ticker until a header is clicked
+        self.sort_order = SortOrder()
         self.tickers = tickers
         assert self.tickers
         self.details_template = details_template
         assert self.details_template
+        self.fetch_workers = workers
+        # the latest record per ticker and when it was fetched
+        self.records: dict[str, tuple] = {}
+        self.fetched_at: dict[str, float] = {}
+        # tickers restored from the snapshot and not refreshed yet
+        self.stale: set[str] = set()
+        self.screener = Screener(self.records)
+        self.screener_expression: Any = None
+        # the match count stays in the status line while screening
+        self.screener_status = ''
+        self.status_text = ''
+        # the watchlists, tickers are their union
+        self.tickers_paths = tickers_paths or []
+        self.watchers: list[FileWatcher] = []
+        # tickers file -> the empty file seen, to tell it from a save under way
+        self.emptied: dict[str, tuple[int, int, int] | None] = {}
+        self.sparklines = Sparklines() if sparkline else None
+        self.alerts = alerts
+        self.alert_command = alert_command
+        # where to publish the columnar snapshot
+        self.publish = publish
+        # record the fetched batches, or replay the recorded ones instead
+        self.recorder = recorder
+        self.replay_log = replay_log
+        self.speed = speed
+        # the holdings valued as their records come in
+        self.portfolio = portfolio
+        self.columns = [
+            *headers,
+            *([sparkline_header] if sparkline else []),
+            *(portfolio_headers if portfolio is not None else ()),
+            age_header,
+        ]
+        # the table cells, the table widget renders just the rows in view
+        self.row_model = RowModel(self.columns)
         return
 
     def compose(self) -> ComposeResult:
@@ -83,11 +200,13 @@ class TheApp(App):
         log.debug('compose %s', self)
         self.tkrs: yf.Tickers | None = None
         yield Header()
+        yield Input(
+            placeholder='Screener, e.g.: Change% < -3 and Price < High1y*0.8',
+            id='screener',
+        )
         yield SplitContainer(
-            before=DataTable(cursor_type='row', zebra_stripes=True, id='tickers'),
-            after=MarkdownViewer(
-                id='details', show_table_of_contents=False, open_links=False
-            ),
+            before=TickersTable(self.row_model, self.sort_order, id='tickers'),
+            after=DetailsPane(self.details_template, id='details'),
         )
         with Horizontal(id='footer-outer'):
             yield Label('This is the left side label', id='status')
@@ -99,91 +218,288 @@ class TheApp(App):
         assert log is not None
         log.debug('on_mount %s', self)
 
-        def fill_table(table: DataTable, headers: list[str], rows: list[str]) -> None:
-            # add columns and set column key
-            for h in headers:
-                table.add_column(h, key=h)
-
-            # add rows and set row key
-            for row in rows:
-                r = [row if h == headers[0] else '.' for h in headers]
-                table.add_row(*r, key=row)
-            return
-
-        self.tickers_table = self.query_one('#tickers', DataTable)
-        self.details = self.query_one('#details', MarkdownViewer)
+        self.tickers_table = self.query_one('#tickers', TickersTable)
+        self.details = self.query_one('#details', DetailsPane)
         self.status = self.query_one('#status', Label)
         # self.footer_inner = self.query_one('#footer-inner')
         self.footer = self.query_one('#footer', Footer)
-        fill_table(self.tickers_table, list(headers), sorted(self.tickers))
+        # show the last known records right away, refresh them in the background;
+        # a replay starts from none, its alerts fire on the recorded values only
+        snapshot = load_snapshot() if self.replay_log is None else {}
+        for symbol in self.tickers & snapshot.keys():
+            self.fetched_at[symbol], self.records[symbol] = snapshot[symbol]
+            self.stale.add(symbol)
+            if self.portfolio is not None:
+                self.portfolio.update(self.records[symbol])
+        for symbol in self.tickers:
+            self.row_model.set_row(symbol, self.row_cells(symbol))
+        self.sort_order.reset({symbol: symbol for symbol in self.tickers})
+        self.tickers_table.rows_changed()
+        # keep the keys for the bindings until the screener is asked for
+        self.tickers_table.focus()
 
         # adjust footer status styles
         self.status.styles.background = self.footer.styles.background
         self.status.styles.color = self.footer.styles.color
+
+        if self.tickers_paths:
+            self.watchers = [FileWatcher(path) for path in self.tickers_paths]
+            self.set_interval(watch_interval, self.check_tickers_file)
+        if self.stale:
+            self.set_interval(age_interval, self.refresh_ages)
+        self.action_update()
         return
 
-    def on_data_table_header_selected(self, message: DataTable.HeaderSelected) -> None:
+    def refresh_ages(self) -> None:
+        """
+        Keep the age of the rows not refreshed yet up to date.
+        """
+        now = time.time()
+        for symbol in self.stale:
+            if symbol not in self.sort_order:
+                continue
+            age = format_age(now - self.fetched_at[symbol])
+            if self.row_model.get(symbol, age_header) != age:
+                self.row_model.set(symbol, age_header, age)
+                self.tickers_table.refresh_symbol(symbol)
+        return
+
+    def on_unmount(self) -> None:
+        for watcher in self.watchers:
+            watcher.close()
+        return
+
+    def check_tickers_file(self) -> None:
+        """
+        Add and remove the table rows as the tickers files change.
+        """
+        # poll all the watchers to drain their events
+        changed = [watcher.changed() for watcher in self.watchers]
+        if not any(changed):
+            return
+        assert log is not None
+        tickers: set[str] = set()
+        for path, watcher in zip(self.tickers_paths, self.watchers, strict=True):
+            try:
+                watchlist = load_tickers(path)
+            except OSError as err:
+                # retried on the next tick
+                log.warning('Failed to reload %s: %s', path, err)
+                return
+            if not watchlist and self.emptied.get(path) != watcher.seen:
+                # most likely caught the file in the middle of a save, it is
+                # taken as emptied if still the same on the next tick
+                self.emptied[path] = watcher.seen
+                return
+            tickers |= watchlist
+        for watcher in self.watchers:
+            watcher.accept()
+        if self.portfolio is not None:
+            # the holdings stay valued
+            tickers |= self.portfolio.holdings.keys()
+        added = tickers - self.tickers
+        removed = self.tickers - tickers
+        log.debug('Tickers added: %s, removed: %s', added, removed)
+        self.tickers = tickers
+        for symbol in removed:
+            if symbol in self.sort_order:
+                self.remove_ticker_row(symbol)
+            self.records.pop(symbol, None)
+            self.fetched_at.pop(symbol, None)
+            self.stale.discard(symbol)
+            if self.sparklines is not None:
+                self.sparklines.remove(symbol)
+        if removed:
+            self.screener.invalidate(removed)
+        if self.screener_expression is None:
+            # otherwise added rows are shown once their records match
+            for symbol in sorted(added):
+                self.add_ticker_row(symbol)
+        if added:
+            self.fetch_added(added, self.bars_since())
+        if added or removed:
+            self.set_status(f'Tickers added: {len(added)}, removed: {len(removed)}')
+        return
+
+    @work(group='yfinance-added', thread=True, exit_on_error=False)
+    def fetch_added(self, added: set[str], bars_since: dict[str, int] | None) -> None:
+        """
+        Download info for the newly added tickers only.
+        """
+        tkrs, batch = fetch_tickers(added, bars_since)
+        self.record(batch)
+        self.post_message(RecordsMessage(*batch))
+        if self.tkrs is not None:
+            self.tkrs.tickers.update(tkrs.tickers)
+        return
+
+    def on_tickers_table_header_selected(
+        self, message: TickersTable.HeaderSelected
+    ) -> None:
         """
         Handles a click on a column header.
         """
         assert log is not None
-        log.debug('on_data_table_header_selected %s', message.data_table.id)
-        if message.data_table != self.tickers_table:
+        log.debug('on_tickers_table_header_selected %s', message.table.id)
+        if message.table != self.tickers_table:
             log.debug('Ignoring message: %s', message)
             return
-        if self.column_index_selected != message.column_index:
-            self.column_sort_reverse = False
-            self.column_index_selected = message.column_index
+        column = message.column_index
+        reverse = column == self.sort_order.column and not self.sort_order.reverse
+        shown = list(self.sort_order.by_symbol)
+        self.sort_order = SortOrder(column, reverse=reverse)
+        self.sort_order.reset({symbol: self.sort_value(symbol) for symbol in shown})
+        self.tickers_table.set_order(self.sort_order)
+        return
+
+    def row_cells(self, symbol: str) -> list[Any]:
+        """
+        Table cells for the symbol
+        """
+        record = self.records.get(symbol)
+        cells: list[Any]
+        if record is None:
+            cells = [symbol, *['.'] * (len(headers) - 1)]
         else:
-            self.column_sort_reverse = not self.column_sort_reverse
+            cells = ['.' if v is None else v for v in record]
+        if self.sparklines is not None:
+            cells.append(self.sparklines.render(symbol))
+        if self.portfolio is not None:
+            cells.extend(self.portfolio.cells(symbol))
+        age = ''
+        if symbol in self.stale:
+            age = format_age(time.time() - self.fetched_at[symbol])
+        cells.append(age)
+        return cells
+
+    def add_ticker_row(self, symbol: str) -> None:
+        """
+        Add the row in its sorted position
+        """
+        self.row_model.set_row(symbol, self.row_cells(symbol))
+        i = self.sort_order.add(symbol, self.sort_value(symbol))
+        self.tickers_table.rows_changed(i)
+        return
+
+    def remove_ticker_row(self, symbol: str) -> None:
+        self.row_model.remove(symbol)
+        i = self.sort_order.remove(symbol)
+        self.tickers_table.rows_changed(i)
+        return
+
+    def action_screener(self) -> None:
+        """
+        Focus the screener input
+        """
+        self.query_one('#screener', Input).focus()
+        return
 
+    def on_input_changed(self, event: Input.Changed) -> None:
+        """
+        Filter the table as the screener expression is typed.
+        """
+        if event.input.id != 'screener':
+            return
         try:
-            self.tickers_table.sort(
-                message.column_key, reverse=self.column_sort_reverse
+            self.screener_expression = compile_expression(event.value)
+        except ScreenerError as err:
+            self.set_status(str(err))
+            return
+        self.apply_screener()
+        return
+
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        if event.input.id == 'screener':
+            self.tickers_table.focus()
+        return
+
+    def apply_screener(self) -> None:
+        """
+        Show only the rows matching the screener expression.
+        """
+        matches = self.screener.select(self.screener_expression, self.tickers)
+        shown = set(self.sort_order.by_symbol)
+        removed = shown - matches
+        added = matches - shown
+        if len(removed) + len(added) > max(max_row_changes, len(matches) // 8):
+            # cheaper to re-sort than to move most of the rows around
+            self.row_model.clear()
+            for symbol in matches:
+                self.row_model.set_row(symbol, self.row_cells(symbol))
+            self.sort_order.reset(
+                {symbol: self.sort_value(symbol) for symbol in matches}
             )
-        except Exception:
-            log.exception('Error sorting table:')
+            self.tickers_table.rows_changed()
+        else:
+            for symbol in removed:
+                self.remove_ticker_row(symbol)
+            for symbol in sorted(added):
+                self.add_ticker_row(symbol)
+        if self.screener_expression is None:
+            self.screener_status = ''
+        else:
+            self.screener_status = f'Screener: {len(matches)} of {len(self.tickers)}'
+        self.set_status(self.status_text)
         return
 
-    def on_data_table_row_highlighted(self, event: DataTable.RowHighlighted) -> None:
+    def sort_value(self, symbol: str) -> object:
+        """
+        The value of the symbol in the sort column
+        """
+        column = self.sort_order.column
+        if column == 0:
+            return symbol
+        header = self.columns[column]
+        if header == age_header:
+            # the most recent first
+            fetched_at = self.fetched_at.get(symbol)
+            return None if fetched_at is None else -fetched_at
+        if header == sparkline_header:
+            return None if self.sparklines is None else self.sparklines.trend(symbol)
+        if header in portfolio_headers:
+            assert self.portfolio is not None
+            return self.portfolio.sort_value(symbol, header)
+        record = self.records.get(symbol)
+        return None if record is None else record[column]
+
+    def on_tickers_table_row_highlighted(
+        self, event: TickersTable.RowHighlighted
+    ) -> None:
         """
-        Row in the DataTable is highlighted.
+        Row in the tickers table is highlighted.
         """
-        row_key = event.row_key
         assert log is not None
-        log.debug('Row highlighted: %s %s', row_key.value, event.data_table.id)
-        if event.data_table != self.tickers_table:
+        log.debug('Row highlighted: %s %s', event.symbol, event.table.id)
+        if event.table != self.tickers_table:
             log.debug('Ignoring event: %s', event)
             return
+        self.set_status(event.symbol)
         if self.tkrs is not None:
-            ticker = self.tkrs.tickers.get(row_key.value)
-            if ticker is not None:
-                log.debug('Ticker: %s', ticker)
-                self.update_details(ticker)
-                self.set_status(ticker.info['longName'])
-                return
-        if row_key.value:
-            self.set_status(row_key.value)
+            self.load_details(event.symbol)
         return
 
-    def update_details(self, ticker: yf.Ticker) -> None:
+    @work(group='details', exclusive=True, thread=True, exit_on_error=False)
+    def load_details(self, symbol: str) -> None:
+        """
+        Get the ticker info for the details pane off the UI thread,
+        it is fetched on demand unless the update has already done so.
         """
-        Update the details table with info from the selected ticker.
+        assert self.tkrs is not None
+        ticker = self.tkrs.tickers.get(symbol)
+        if ticker is not None:
+            self.post_message(DetailsMessage(symbol, ticker.info))
+        return
+
+    def on_details_message(self, message: DetailsMessage) -> None:
+        """
+        Show the details unless another row is highlighted by now.
         """
         assert log is not None
-        log.debug('update_details %s', ticker)
-        info = ticker.info
-        tvars = dict(info.items())
-        log.debug('corporateActions: %s', tvars.get('corporateActions'))
-        # sanitize data - these are broken for NTDOY
-        for key in ['postMarketPrice', 'postMarketChange', 'postMarketChangePercent']:
-            if key not in tvars:
-                tvars[key] = 0
-            elif tvars[key] == '':
-                tvars[key] = 0
-        markdown = self.details_template.render(tvars)
-        log.debug('markdown %s', markdown)
-        self.details.document.update(markdown)
+        log.debug('Details of %s', message.symbol)
+        if self.tickers_table.cursor_symbol() != message.symbol:
+            return
+        self.details.show(message.symbol, message.info)
+        self.set_status(message.info.get('longName', message.symbol))
         return
 
     # def on_timer(self, message: Timer) -> None:
@@ -208,59 +524,230 @@ class TheApp(App):
         """
         assert log is not None
         log.debug('action_update %s', self)
+        if self.replay_log is not None:
+            self.set_status('Replaying...')
+            self.run_replay(self.replay_log)
+            return
         self.set_status('Updating...')
-        self.run_long_task()
+        self.run_long_task(self.bars_since())
         return
 
-    @work(group='yfinance', exclusive=True, thread=True)
-    def run_long_task(self) -> None:
+    def bars_since(self) -> dict[str, int] | None:
+        """
+        Time of the last bar per ticker for the sparklines, None for no bars
+        """
+        return None if self.sparklines is None else self.sparklines.since()
+
+    @work(group='yfinance', exclusive=True, thread=True, exit_on_error=False)
+    def run_long_task(self, bars_since: dict[str, int] | None) -> None:
         """
         Download ticker info in the background.
         group: A short string to identify a group of workers.
         exclusive: Cancel all workers in the same group.
         thread: Mark the method as a thread worker.
+        exit_on_error: Keep the app, e.g. the last known data, on a network error.
         """
-        self.tkrs = yf.Tickers(list(self.tickers))
-        self.tkrs.history(period='1d', repair=True, progress=False)
+        if self.fetch_workers > 1:
+            # the records stream back from the process pool shard by shard
+            for batch in fetch_batches(self.tickers, self.fetch_workers, bars_since):
+                self.record(batch)
+                self.post_message(RecordsMessage(*batch))
+            # ticker info for the details pane is fetched on demand
+            self.tkrs = yf.Tickers(list(self.tickers))
+        else:
+            tkrs, batch = fetch_tickers(self.tickers, bars_since)
+            self.record(batch)
+            self.post_message(RecordsMessage(*batch))
+            self.tkrs = tkrs
         self.post_message(TaskCompleteMessage())
         return
 
-    def on_task_complete_message(self, message: TaskCompleteMessage) -> None:
+    def record(self, batch: Batch) -> None:
         """
-        Called when the background task is complete.
+        Append the fetched batch to the log, if recording.
         """
-        self.notify('Background task finished!')
+        if self.recorder is None:
+            return
+        assert log is not None
+        try:
+            self.recorder.append(batch)
+        except OSError as err:
+            log.warning('Failed to record: %s', err)
+        return
+
+    @work(group='yfinance', exclusive=True, thread=True, exit_on_error=False)
+    def run_replay(self, replay_log: ReplayLog) -> None:
+        """
+        Feed the recorded batches to the table at the replay speed.
+        """
+        worker = get_current_worker()
+        throughput = Throughput()
+        for frame in throughput.count(replay(replay_log, self.speed)):
+            if worker.is_cancelled:
+                return
+            self.post_message(RecordsMessage(*frame.batch, frame.time))
+        self.post_message(ReplayCompleteMessage(throughput))
+        return
+
+    def on_replay_complete_message(self, message: ReplayCompleteMessage) -> None:
+        """
+        All the replayed records are in the table, report the throughput.
+        """
+        assert log is not None
+        log.info('%s', message.throughput)
+        self.set_status(str(message.throughput))
+        return
 
-        def update_table(table: DataTable, tkrs: yf.Tickers) -> None:
-            for ticker in tkrs.tickers.values():
-                info = ticker.info
-                for k, v in header2ticker_info.items():
-                    if table.get_cell(ticker.ticker, k) is None:
-                        continue
-                    if info.get(v) is None:
-                        continue
-                    table.update_cell(ticker.ticker, k, info.get(v))
-                table.update_cell(
-                    ticker.ticker,
-                    headers[-1],
-                    '; '.join(analyze_ticker(ticker)),
-                    update_width=True,
+    def on_records_message(self, message: RecordsMessage) -> None:
+        """
+        Called when a batch of records is fetched.
+        """
+        table = self.tickers_table
+        model = self.row_model
+        column = self.sort_order.column
+        now = time.time() if message.fetched_at is None else message.fetched_at
+        # append the new bars, the sparklines are re-rendered only if they change
+        trends: set[str] = set()
+        # only the refreshed holdings are re-valued
+        valued = False
+        # the shown rows to reposition in the sort order
+        resorted: list[str] = []
+        if self.sparklines is not None:
+            for symbol, bars in message.bars.items():
+                if symbol in self.tickers and self.sparklines.append(symbol, bars):
+                    trends.add(symbol)
+        for record1 in message.records:
+            symbol = record1[0]
+            if symbol not in self.tickers:
+                continue
+            old = self.records.get(symbol)
+            # keep the last known values missing from the update
+            record = (
+                record1
+                if old is None
+                else tuple(
+                    o if v is None else v for v, o in zip(record1, old, strict=True)
                 )
+            )
+            self.records[symbol] = record
+            self.fetched_at[symbol] = now
+            if self.alerts is not None:
+                for alert, text in self.alerts.check(old, record, now):
+                    self.fire_alert(alert, text)
+            held = self.portfolio is not None and self.portfolio.update(record)
+            valued = valued or held
+            was_stale = symbol in self.stale
+            self.stale.discard(symbol)
+            if symbol not in self.sort_order:
+                # filtered out by the screener
+                continue
+            for k, v in zip(headers[1:], record[1:], strict=True):
+                if v is None:
+                    continue
+                model.set(symbol, k, v)
+            if symbol in trends:
+                assert self.sparklines is not None
+                model.set(symbol, sparkline_header, self.sparklines.render(symbol))
+            if held:
+                assert self.portfolio is not None
+                cells = self.portfolio.cells(symbol)
+                for k, v in zip(portfolio_headers, cells, strict=True):
+                    model.set(symbol, k, v)
+            if was_stale:
+                model.set(symbol, age_header, '')
+            # redrawn only if in view
+            table.refresh_symbol(symbol)
+            if column != 0:
+                resorted.append(symbol)
+        self.resort(resorted)
+        self.screener.invalidate(record[0] for record in message.records)
+        if self.screener_expression is not None:
+            self.apply_screener()
+        if valued:
+            assert self.portfolio is not None
+            self.set_status(self.portfolio.summary())
+        return
 
+    def resort(self, symbols: list[str]) -> None:
+        """
+        Reposition the rows of the symbols for their new sort values.
+        """
+        if len(symbols) > max(max_row_changes, len(self.sort_order) // 8):
+            # cheaper to re-sort than to move most of the rows around
+            self.sort_order.reset(
+                {
+                    symbol: self.sort_value(symbol)
+                    for symbol in self.sort_order.by_symbol
+                }
+            )
+            self.tickers_table.rows_changed()
             return
+        # the rows moved, redrawn at once
+        lo, hi = len(self.sort_order), -1
+        for symbol in symbols:
+            i, j = self.sort_order.update(symbol, self.sort_value(symbol))
+            if i != j:
+                lo, hi = min(lo, i, j), max(hi, i, j)
+        if lo <= hi:
+            self.tickers_table.rows_changed(lo, hi + 1)
+        return
 
-        update_table(self.tickers_table, self.tkrs)
-        self.set_status('Updated')
+    def fire_alert(self, alert: Alert, text: str) -> None:
+        """
+        Notify about the alert and run the alert command, if any.
+        """
+        assert log is not None
+        log.info('Alert: %s', text)
+        self.notify(text, title='Alert', severity='warning', timeout=10)
+        if self.alert_command:
+            try:
+                run_alert_command(self.alert_command, alert, text)
+            except OSError as err:
+                log.warning('Alert command failed: %s', err)
+        return
+
+    def on_task_complete_message(self, message: TaskCompleteMessage) -> None:
+        """
+        Called when the background task is complete.
+        """
+        self.notify('Background task finished!')
+        if self.portfolio is not None:
+            self.set_status(f'Updated. {self.portfolio.summary()}')
+        else:
+            self.set_status('Updated')
+        self.save_snapshot_task(dict(self.records), dict(self.fetched_at))
         # self.status.styles.width = '25%'
         # self.footer_inner.styles.width = '75%'
         assert log is not None
         log.debug('action_update DONE')
         return
 
+    @work(group='snapshot', exclusive=True, thread=True)
+    def save_snapshot_task(
+        self, records: dict[str, tuple], fetched_at: dict[str, float]
+    ) -> None:
+        """
+        Save the records for the next start and publish them in the background.
+        """
+        assert log is not None
+        try:
+            save_snapshot(records, fetched_at)
+        except OSError as err:
+            log.warning('Failed to save the snapshot: %s', err)
+        if self.publish is not None:
+            try:
+                publish_snapshot(self.publish, records, fetched_at)
+            except OSError as err:
+                log.warning('Failed to publish the snapshot: %s', err)
+        return
+
     def on_worker_state_changed(self, event: Worker.StateChanged) -> None:
         """Called when the worker state changes."""
         assert log is not None
         log.debug('on_worker_state_changed %s', event)
+        if event.state == WorkerState.ERROR:
+            log.error('Worker %s failed: %s', event.worker.name, event.worker.error)
+            self.set_status(f'Update failed: {event.worker.error}')
         return
 
     def set_status(self, text: str) -> None:
@@ -269,6 +756,9 @@ class TheApp(App):
         log.debug('set_status %s', text)
         # self.status.styles.width = '75%'
         # self.footer_inner.styles.width = '25%'
+        self.status_text = text
+        if self.screener_status:
+            text = f'{self.screener_status} | {text}' if text else self.screener_status
         self.status.update(text)
         return
 
@@ -288,51 +778,23 @@ class TheApp(App):
         # self.set_css_vars(font_size=f'{new_font_size}em')
         return
 
-#
-# Custom global functions for use in the jinja template
-#
-def format_num(num: str) -> str:
-    try:
-        val = int(num)
-        if val < 10000:
-            return f'{val:,d}'
-        if val < 10000000:
-            val = val // 1000
-            return f'{val:,d}K'
-        if val < 10000000000:
-            val = val // 1000000
-            return f'{val:,d}M'
-        if val < 10000000000000:
-            val = val // 1000000000
-            return f'{val:,d}B'
-        val = val // 1000000000000
-        return f'{val:,d}T'
-    except (UndefinedError, ValueError):
-        pass
-    return ''
-
-def format_date(val: str) -> str:
-    try:
-        return datetime.fromtimestamp(int(val)).strftime('%Y-%m-%d')
-    except (UndefinedError, ValueError):
-        pass
-    return ''
-
-def safe(val: str) -> str:
-    try:
-        return val
-    except UndefinedError:
-        pass
-    return ''
 
-def is_defined(val: str) -> bool:
-    try:
-        return True
-    except UndefinedError:
-        pass
-    return False
-
-def run_tui(log_level: int, tickers: set[str], details_path: str) -> int:
+def run_tui(
+    log_level: int,
+    tickers: set[str],
+    details_path: str,
+    *,
+    workers: int = 0,
+    tickers_paths: list[str] | None = None,
+    sparkline: bool = False,
+    alerts: AlertBook | None = None,
+    alert_command: str | None = None,
+    publish: str | None = None,
+    record: str | None = None,
+    replay_log: ReplayLog | None = None,
+    speed: float = 1.0,
+    portfolio: Portfolio | None = None,
+) -> int:
     """
     Main TUI entry point
     """
@@ -340,17 +802,31 @@ def run_tui(log_level: int, tickers: set[str], details_path: str) -> int:
     log = setup_logging(__name__, log_level)
     log.info('Logger: %s', log)
     # log.info('Details Template: %s', details)
+    try:
+        recorder = None if record is None else Recorder(record)
+    except OSError as err:
+        eprint(f"ERROR: failed to open '{record}': {err}")
+        return 1
 
     try:
-        env = Environment(autoescape=True, loader=FileSystemLoader(''))
-        # define custom global functions for use in the template
+        env = template_environment()
         log.debug('Environment: %s', env)
         log.debug('Environment.globals: %s', env.globals)
-        env.globals['format_num'] = format_num
-        env.globals['format_date'] = format_date
-        env.globals['is_defined'] = is_defined
         details_template = env.get_template(details_path)
-        app = TheApp(tickers, details_template)
+        app = TheApp(
+            tickers,
+            details_template,
+            workers=workers,
+            tickers_paths=tickers_paths,
+            sparkline=sparkline,
+            alerts=alerts,
+            alert_command=alert_command,
+            publish=publish,
+            recorder=recorder,
+            replay_log=replay_log,
+            speed=speed,
+            portfolio=portfolio,
+        )
         app.run()
         return 0
 
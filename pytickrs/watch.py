@@ -0,0 +1,126 @@
+"""
+Watch a file for changes: inotify on Linux, stat polling elsewhere.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+from pathlib import Path
+
+from .log import setup_logging
+
+log = setup_logging(__name__)
+
+# inotify(7) event masks
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+# struct inotify_event: wd, mask, cookie, len, followed by the name
+inotify_event = struct.Struct('iIII')
+
+
+def inotify_init(path: Path) -> int | None:
+    """
+    Returns a non-blocking inotify fd watching the directory of path,
+    None if inotify is not available.
+    """
+    if not sys.platform.startswith('linux'):
+        return None
+    libname = ctypes.util.find_library('c')
+    if libname is None:
+        return None
+    try:
+        libc = ctypes.CDLL(libname, use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    except (OSError, AttributeError):
+        log.debug('inotify is not available')
+        return None
+    if fd < 0:
+        return None
+    # watch the directory, editors often replace the file instead of writing it
+    mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    wd = libc.inotify_add_watch(fd, os.fsencode(path.parent), mask)
+    if wd < 0:
+        os.close(fd)
+        return None
+    return int(fd)
+
+
+class FileWatcher:
+    """
+    Tell if the file has changed since it was last accepted, so a reload
+    failing or caught mid-save is retried on the next call of changed().
+    Uses inotify if available, falls back to comparing os.stat results.
+    """
+
+    def __init__(self, fname: str, *, use_inotify: bool = True) -> None:
+        self.path = Path(fname).absolute()
+        self.name = os.fsencode(self.path.name)
+        self.fd = inotify_init(self.path) if use_inotify else None
+        # the accepted and the last seen file
+        self.signature = self.seen = self.stat()
+        # inotify reported the file, not accepted yet
+        self.pending = False
+        log.debug('Watching %s, inotify fd: %s', self.path, self.fd)
+        return
+
+    def stat(self) -> tuple[int, int, int] | None:
+        try:
+            st = self.path.stat()
+        except OSError:
+            return None
+        return st.st_ino, st.st_size, st.st_mtime_ns
+
+    def changed(self) -> bool:
+        """
+        Returns True if the file has changed since accept(), never blocks.
+        """
+        if self.fd is not None:
+            self.pending = self.read_events() or self.pending
+            if not self.pending:
+                return False
+        self.seen = self.stat()
+        if self.seen == self.signature:
+            self.pending = False
+            return False
+        return True
+
+    def accept(self) -> None:
+        """
+        Take the file last seen by changed() as reloaded.
+        """
+        self.signature = self.seen
+        self.pending = False
+        return
+
+    def read_events(self) -> bool:
+        """
+        Drain inotify events, returns True if any of them is about our file.
+        """
+        assert self.fd is not None
+        found = False
+        while True:
+            try:
+                buf = os.read(self.fd, 4096)
+            except BlockingIOError:
+                break
+            if not buf:
+                break
+            offset = 0
+            while offset < len(buf):
+                _, _, _, length = inotify_event.unpack_from(buf, offset)
+                offset += inotify_event.size
+                name = buf[offset : offset + length].rstrip(b'\0')
+                offset += length
+                if name == self.name:
+                    found = True
+        return found
+
+    def close(self) -> None:
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+        return
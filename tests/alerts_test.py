@@ -0,0 +1,56 @@
+import unittest
+
+from pytickrs.alerts import AlertBook, parse_alert
+
+from .records import record
+
+
+def quote(price: float, change_pct: float = 0.0) -> tuple:
+    return record('AAPL', price, Low1y=100.0, High1y=200.0, ChangePct=change_pct)
+
+
+class TestAlerts(unittest.TestCase):
+    """
+    Verify the alerts fire on crossing the thresholds
+    """
+
+    def test_parse(self) -> None:
+        alert = parse_alert('aapl Price > 150')
+        self.assertEqual(alert.symbol, 'AAPL')
+        self.assertEqual(alert.metric, 'price')
+        self.assertEqual(alert.level, 150.0)
+        self.assertEqual(parse_alert('AAPL high52').metric, 'high52')
+        for line in ('AAPL price', 'AAPL volume > 3', 'AAPL price >= 3', 'AAPL x'):
+            with self.assertRaises(ValueError):
+                parse_alert(line)
+        return
+
+    def test_crossing(self) -> None:
+        lines = ('AAPL price > 150', 'AAPL price > 160', 'AAPL price < 140')
+        book = AlertBook([parse_alert(line) for line in lines])
+        self.assertEqual(book.check(None, quote(155), 0), [])
+        fired = book.check(quote(145), quote(155), 0)
+        self.assertEqual([a.level for a, _ in fired], [150.0])
+        # no crossing, no alert
+        self.assertEqual(book.check(quote(155), quote(158), 1), [])
+        fired = book.check(quote(158), quote(135), 2)
+        self.assertEqual([a.level for a, _ in fired], [140.0])
+        return
+
+    def test_debounce(self) -> None:
+        book = AlertBook([parse_alert('AAPL price crosses 150')], debounce=60)
+        self.assertEqual(len(book.check(quote(149), quote(151), 0)), 1)
+        self.assertEqual(len(book.check(quote(151), quote(149), 30)), 0)
+        self.assertEqual(len(book.check(quote(149), quote(151), 100)), 1)
+        return
+
+    def test_change_and_extremes(self) -> None:
+        lines = ('AAPL change% < -3', 'AAPL high52', 'AAPL low52')
+        book = AlertBook([parse_alert(line) for line in lines])
+        fired = book.check(quote(150, -2), quote(150, -4), 0)
+        self.assertEqual([a.metric for a, _ in fired], ['change%'])
+        fired = book.check(quote(199), quote(201), 0)
+        self.assertEqual([a.metric for a, _ in fired], ['high52'])
+        fired = book.check(quote(101), quote(100), 0)
+        self.assertEqual([a.metric for a, _ in fired], ['low52'])
+        return
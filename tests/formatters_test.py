@@ -0,0 +1,57 @@
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from jinja2 import Undefined
+
+from pytickrs.formatters import format_date, format_num
+from pytickrs.templates import template_environment
+
+
+class TestFormatters(unittest.TestCase):
+    """
+    Verify the template formatters
+    """
+
+    def test_format_num(self) -> None:
+        self.assertEqual(format_num(9999), '9,999')
+        self.assertEqual(format_num('12345'), '12K')
+        self.assertEqual(format_num(3_456_789_012), '3,456M')
+        self.assertEqual(format_num(12_345_678_901), '12B')
+        self.assertEqual(format_num(3_000_000_000_000_000), '3,000T')
+        self.assertEqual(format_num(-5), '-5')
+        self.assertEqual(format_num(12.5), '12')
+        for bad in ('abc', None, Undefined(name='x')):
+            self.assertEqual(format_num(bad), '')
+        return
+
+    def test_format_date(self) -> None:
+        ts = 1_700_000_000
+        self.assertEqual(format_date(ts), time.strftime('%Y-%m-%d', time.localtime(ts)))
+        self.assertEqual(format_date(str(ts)), format_date(ts))
+        for bad in ('abc', None, Undefined(name='x'), 10**30):
+            self.assertEqual(format_date(bad), '')
+        return
+
+    def test_bytecode_cache(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            # the templates are loaded relative to the current directory
+            self.addCleanup(os.chdir, Path.cwd())
+            os.chdir(tmp)
+            cache = Path(tmp) / 'cache'
+            template = Path(tmp) / 'details.md'
+            template.write_text('{{ format_num(n) }}')
+            name = template.name
+            env = template_environment(cache)
+            self.assertEqual(env.get_template(name).render(n=12345), '12K')
+            self.assertEqual(len(list(cache.iterdir())), 1)
+            # a new start loads the compiled template
+            env = template_environment(cache)
+            self.assertEqual(env.get_template(name).render(n=1), '1')
+            # and compiles it again once the file changes
+            template.write_text('n={{ n }}')
+            env = template_environment(cache)
+            self.assertEqual(env.get_template(name).render(n=1), 'n=1')
+        return
@@ -0,0 +1,28 @@
+import unittest
+
+from pytickrs.once import format_table, watchlist_outputs
+
+from .records import record
+
+
+class TestWatchlists(unittest.TestCase):
+    """
+    Verify the per watchlist output of --once
+    """
+
+    def test_format_table(self) -> None:
+        records = {s: record(s, 1.5) for s in ('MSFT', 'AAPL', 'NVDA')}
+        lines = format_table(records, {'NVDA', 'AAPL', 'GONE'}).splitlines()
+        # headers, separator and the fetched symbols sorted
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(lines[2].startswith('AAPL'))
+        self.assertTrue(lines[3].startswith('NVDA'))
+        return
+
+    def test_outputs(self) -> None:
+        outputs = watchlist_outputs(['a/desk.txt', 'b/desk.txt', 'tech'], 'out')
+        self.assertEqual(
+            [str(p) for p in outputs.values()],
+            ['out/desk.txt', 'out/desk-2.txt', 'out/tech.txt'],
+        )
+        return
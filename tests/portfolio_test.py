@@ -0,0 +1,51 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from pytickrs.portfolio import Holding, Portfolio, load_holdings
+
+from .records import record
+
+
+class TestPortfolio(unittest.TestCase):
+    """
+    Verify the positions and their totals
+    """
+
+    def setUp(self) -> None:
+        self.portfolio = Portfolio(
+            [Holding('AAPL', 10, 100.0), Holding('MSFT', 2, 50.0)]
+        )
+        return
+
+    def totals(self) -> tuple[float, float, float]:
+        p = self.portfolio
+        return round(p.value, 6), round(p.day_pnl, 6), round(p.total_pnl, 6)
+
+    def test_incremental(self) -> None:
+        self.assertTrue(self.portfolio.update(record('AAPL', 110.0, Change=2.0)))
+        self.assertFalse(self.portfolio.update(record('NVDA', 1.0, Change=1.0)))
+        self.assertEqual(self.totals(), (1100.0, 20.0, 100.0))
+        self.portfolio.update(record('MSFT', 40.0, Change=None))
+        self.assertEqual(self.totals(), (1180.0, 20.0, 80.0))
+        # a refresh replaces the old contribution of the ticker
+        self.portfolio.update(record('AAPL', 90.0, Change=-1.0))
+        self.assertEqual(self.totals(), (980.0, -10.0, -120.0))
+        self.assertEqual(self.portfolio.cells('AAPL'), [900.0, -10.0, -100.0])
+        self.assertEqual(self.portfolio.cells('MSFT'), [80.0, '.', -20.0])
+        # no price, no position
+        self.portfolio.update(record('AAPL', None, Change=None))
+        self.assertEqual(self.totals(), (80.0, 0.0, -20.0))
+        self.assertEqual(self.portfolio.cells('AAPL'), ['.', '.', '.'])
+        self.assertEqual(self.portfolio.cells('NVDA'), ['', '', ''])
+        self.assertIn('(-20.0%)', self.portfolio.summary())
+        return
+
+    def test_load(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'holdings.txt'
+            path.write_text('# lots\naapl 10 100\nAAPL, 30, 200\n\nMSFT 1 1\n')
+            holdings = load_holdings(str(path))
+        self.assertEqual(holdings['AAPL'], Holding('AAPL', 40, 175.0))
+        self.assertEqual(holdings['MSFT'], Holding('MSFT', 1, 1.0))
+        return
@@ -0,0 +1,56 @@
+import math
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from pytickrs.publish import PublishedSnapshot, publish_snapshot, read_sequence
+
+
+class TestPublish(unittest.TestCase):
+    """
+    Verify the published snapshot round trip
+    """
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / 'quotes.col'
+        # TIKR, Low1y, Low1d, Bid, Price, Ask, High1d, High1y, Change, Change %, Thoughts
+        self.records = {
+            'MSFT': ('MSFT', 1.0, 2.0, 3.0, 4.5, 5, 6.0, 7.0, 0.5, 1.25, 'buy'),
+            'AAPL': ('AAPL', 1.0, None, 3.0, 4.0, 5.0, 6.0, 7.0, -1.0, -2.5, ''),
+            'ΔX': ('ΔX', 1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 0.0, 0.0, 'ü; ß'),
+        }
+        return
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+        return
+
+    def test_round_trip(self) -> None:
+        self.assertEqual(read_sequence(self.path), 0)
+        seq = publish_snapshot(self.path, self.records, {'AAPL': 100.0})
+        self.assertEqual(seq, 1)
+        with PublishedSnapshot(self.path) as snap:
+            self.assertEqual(snap.sequence, 1)
+            self.assertEqual(snap.rows, 3)
+            self.assertEqual(list(snap.strings('TIKR')), ['AAPL', 'MSFT', 'ΔX'])
+            price = snap.floats('Price')
+            if sys.byteorder == 'little':
+                self.assertIsInstance(price, memoryview)
+            self.assertEqual(list(price), [4.0, 4.5, 4.0])
+            self.assertTrue(math.isnan(snap.floats('Low1d')[0]))
+            self.assertEqual(snap.floats('Fetched at')[0], 100.0)
+            self.assertEqual(snap.records(), self.records)
+        return
+
+    def test_sequence(self) -> None:
+        publish_snapshot(self.path, self.records, {})
+        del self.records['MSFT']
+        self.assertEqual(publish_snapshot(self.path, self.records, {}), 2)
+        self.assertEqual(read_sequence(self.path), 2)
+        with PublishedSnapshot(self.path) as snap:
+            self.assertEqual(list(snap.strings('TIKR')), ['AAPL', 'ΔX'])
+        # no temporary files are left behind
+        self.assertEqual(list(Path(self.tmp.name).iterdir()), [self.path])
+        return
@@ -0,0 +1,57 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from pytickrs.fetch import Batch
+from pytickrs.recorder import Recorder, ReplayLog, index_path, replay
+
+from .records import record
+
+
+class TestRecorder(unittest.TestCase):
+    """
+    Verify the recorded log round trip
+    """
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / 'ticks.log'
+        self.batches = [
+            Batch([record('AAPL', 1.5, Thoughts='buy'), record('MSFT', None)], {}),
+            Batch([record('AAPL', 1.75)], {'AAPL': [(1700000000, 1.5)]}),
+            Batch([record('ΔX', 3.0)], {}),
+        ]
+        recorder = Recorder(str(self.path))
+        for t, batch in enumerate(self.batches, 100):
+            recorder.append(batch, float(t))
+        return
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+        return
+
+    def test_round_trip(self) -> None:
+        log = ReplayLog(str(self.path))
+        self.assertEqual(len(log), 3)
+        frames = list(replay(log, speed=0))
+        self.assertEqual([f.time for f in frames], [100.0, 101.0, 102.0])
+        self.assertEqual([f.batch for f in frames], self.batches)
+        self.assertEqual(log.symbols(), {'AAPL', 'MSFT', 'ΔX'})
+        return
+
+    def test_since(self) -> None:
+        log = ReplayLog(str(self.path))
+        self.assertEqual([f.time for f in log.frames(100.5)], [101.0, 102.0])
+        return
+
+    def test_recovery(self) -> None:
+        # lose the index and tear the last frame
+        index_path(self.path).unlink()
+        with self.path.open('r+b') as f:
+            f.truncate(self.path.stat().st_size - 3)
+        self.assertEqual(len(ReplayLog(str(self.path))), 2)
+        recorder = Recorder(str(self.path))
+        recorder.append(self.batches[0], 103.0)
+        log = ReplayLog(str(self.path))
+        self.assertEqual([f.time for f in log.frames()], [100.0, 101.0, 103.0])
+        return
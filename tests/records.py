@@ -0,0 +1,30 @@
+"""
+Ticker records for the tests, built by the headers of pytickrs.tickers
+"""
+
+from pytickrs.tickers import headers
+
+# header -> value of the columns not given
+defaults = {
+    'Low1y': 1.0,
+    'Low1d': 1.0,
+    'High1d': 2.0,
+    'High1y': 2.0,
+    'Change': 0.0,
+    'Change %': 0.0,
+    'Thoughts': '',
+}
+# keyword of the header, e.g. ChangePct for Change %
+key_headers = {h.replace(' %', 'Pct'): h for h in headers[1:]}
+
+
+def record(symbol: str, price: float | None, **values: object) -> tuple:
+    """
+    Record of the ticker quoted at the price, the bid and ask alike.
+    values: header -> value, the spaces and % of the header left out, e.g.
+    High1y=20.0, Change=1.0, ChangePct=-5.0
+    """
+    row = {**defaults, 'Bid': price, 'Price': price, 'Ask': price}
+    for key, value in values.items():
+        row[key_headers[key]] = value
+    return (symbol, *(row[h] for h in headers[1:]))
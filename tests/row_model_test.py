@@ -0,0 +1,55 @@
+import unittest
+
+from pytickrs.row_model import RowModel, cell_text
+
+
+class TestRowModel(unittest.TestCase):
+    """
+    Verify the columnar table cells
+    """
+
+    def setUp(self) -> None:
+        self.model = RowModel(['TIKR', 'Price', 'Thoughts'])
+        return
+
+    def test_rows(self) -> None:
+        model = self.model
+        model.set_row('AAPL', ['AAPL', 1.5, ''])
+        model.set_row('MSFT', ['MSFT', '.', 'hold'])
+        self.assertEqual(len(model), 2)
+        self.assertIn('AAPL', model)
+        model.set('AAPL', 'Price', 2.0)
+        self.assertEqual(model.row('AAPL'), ['AAPL', 2.0, ''])
+        model.remove('AAPL')
+        model.remove('AAPL')
+        self.assertNotIn('AAPL', model)
+        # the slot of the removed row is reused
+        model.set_row('NVDA', ['NVDA', 3.0, 'buy'])
+        self.assertEqual(len(model.cells[0]), 2)
+        self.assertEqual(model.row('NVDA'), ['NVDA', 3.0, 'buy'])
+        self.assertEqual(model.row('MSFT'), ['MSFT', '.', 'hold'])
+        model.clear()
+        self.assertEqual(len(model), 0)
+        return
+
+    def test_widths(self) -> None:
+        model = self.model
+        self.assertEqual(model.widths, [4, 5, 8])
+        version = model.layout_version
+        model.set_row('AAPL', ['AAPL', 1.5, ''])
+        self.assertEqual(model.layout_version, version)
+        model.set('AAPL', 'Price', 123456.789)
+        model.set('AAPL', 'Thoughts', 'buy the dip')
+        self.assertEqual(model.widths, [4, 9, 11])
+        self.assertGreater(model.layout_version, version)
+        # the columns do not shrink back
+        model.clear()
+        self.assertEqual(model.widths, [4, 9, 11])
+        return
+
+    def test_cell_text(self) -> None:
+        self.assertEqual(cell_text(1.0), '1.00')
+        self.assertEqual(cell_text(12), '12')
+        self.assertEqual(cell_text(None), '')
+        self.assertEqual(cell_text('.'), '.')
+        return
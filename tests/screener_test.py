@@ -0,0 +1,80 @@
+import unittest
+
+from pytickrs.screener import Screener, ScreenerError, compile_expression
+
+from .records import record
+
+
+class TestScreener(unittest.TestCase):
+    """
+    Verify the screener expressions
+    """
+
+    def setUp(self) -> None:
+        self.records = {
+            'A': record('A', 10.0, High1y=20.0, ChangePct=-5.0),
+            'B': record('B', 19.0, High1y=20.0, ChangePct=-4.0),
+            'C': record('C', 5.0, High1y=20.0, ChangePct=1.0),
+            'D': record('D', None, High1y=20.0, ChangePct=-10.0),
+        }
+        self.universe = {*self.records, 'E'}
+        self.screener = Screener(self.records)
+        return
+
+    def select(self, text: str) -> set[str]:
+        return self.screener.select(compile_expression(text), self.universe)
+
+    def test_blank(self) -> None:
+        self.assertEqual(self.select(' '), self.universe)
+        return
+
+    def test_indexed(self) -> None:
+        self.assertEqual(self.select('Change% < -3'), {'A', 'B', 'D'})
+        self.assertEqual(self.select('-3 > change %'), {'A', 'B', 'D'})
+        self.assertEqual(self.select('price >= 10'), {'A', 'B'})
+        self.assertEqual(self.select('Price != 10'), {'B', 'C'})
+        return
+
+    def test_compound(self) -> None:
+        self.assertEqual(self.select('Change% < -3 and Price < High1y*0.8'), {'A'})
+        self.assertEqual(
+            self.select('(Price - 5) * 2 = 10 or Change% < -9'), {'A', 'D'}
+        )
+        self.assertEqual(
+            self.select('not (Price > 6 and Price < 11)'), {'B', 'C', 'D', 'E'}
+        )
+        return
+
+    def test_invalidate(self) -> None:
+        self.assertEqual(self.select('Price > 15'), {'B'})
+        self.records['C'] = record('C', 16.0, High1y=20.0, ChangePct=1.0)
+        self.screener.invalidate(['C'])
+        self.assertEqual(self.select('Price > 15'), {'B', 'C'})
+        # the last slot moves into the freed one
+        del self.records['A']
+        self.records['E'] = record('E', 30.0, High1y=20.0, ChangePct=1.0)
+        self.screener.invalidate(['A', 'E'])
+        self.assertEqual(self.select('Price > 15'), {'B', 'C', 'E'})
+        self.assertEqual(self.select('Price < 15'), set())
+        self.screener.invalidate()
+        self.assertEqual(self.select('Price > 15'), {'B', 'C', 'E'})
+        return
+
+    def test_nulls(self) -> None:
+        # a comparison with a missing value or a division by zero is false
+        self.assertEqual(self.select('Price / (Change% + 5) > 0'), {'B', 'C'})
+        self.assertEqual(self.select('Price != 10 / 0'), set())
+        self.assertEqual(self.select('not Price > 0'), {'D', 'E'})
+        return
+
+    def test_errors(self) -> None:
+        for text in (
+            'Price <',
+            'Volume > 3',
+            'Price > 3 and',
+            'Price $ 3',
+            '(Price > 1',
+        ):
+            with self.assertRaises(ScreenerError):
+                compile_expression(text)
+        return
@@ -0,0 +1,39 @@
+import unittest
+
+from pytickrs.sort_order import SortOrder, sort_key
+
+
+class TestSortOrder(unittest.TestCase):
+    """
+    Verify the maintained sort order
+    """
+
+    def test_nulls_last(self) -> None:
+        values = {'A': 3.0, 'B': None, 'C': '.', 'D': -1, 'E': float('nan')}
+        so = SortOrder(1)
+        so.reset(values)
+        self.assertEqual(so.symbols(), ['D', 'A', 'B', 'C', 'E'])
+        so = SortOrder(1, reverse=True)
+        so.reset(values)
+        self.assertEqual(so.symbols(), ['A', 'D', 'B', 'C', 'E'])
+        return
+
+    def test_mixed_types(self) -> None:
+        self.assertLess(sort_key(10), sort_key('abc'))
+        self.assertLess(sort_key('b', reverse=True), sort_key('a', reverse=True))
+        self.assertLess(sort_key('a', reverse=True), sort_key(None, reverse=True))
+        return
+
+    def test_update(self) -> None:
+        so = SortOrder(1)
+        so.reset({'A': 1, 'B': 2, 'C': 3, 'D': None})
+        self.assertEqual(so.update('A', 2.5), (0, 1))
+        self.assertEqual(so.symbols(), ['B', 'A', 'C', 'D'])
+        self.assertEqual(so.update('D', 0), (3, 0))
+        self.assertEqual(so.symbols(), ['D', 'B', 'A', 'C'])
+        self.assertEqual(so.update('C', 3), (3, 3))
+        self.assertEqual(so.add('E', 2), 2)
+        self.assertEqual(so.remove('D'), 0)
+        self.assertEqual(so.symbols(), ['B', 'E', 'A', 'C'])
+        self.assertEqual(so.index('C'), 3)
+        return
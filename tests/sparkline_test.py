@@ -0,0 +1,49 @@
+import unittest
+
+from pytickrs.sparkline import Sparklines, sparkline
+
+
+class TestSparklines(unittest.TestCase):
+    """
+    Verify the cached bars and the rendered sparklines
+    """
+
+    def test_sparkline(self) -> None:
+        self.assertEqual(sparkline([], 5), '')
+        self.assertEqual(sparkline([1.0, 2.0], 5), '▁█')
+        self.assertEqual(sparkline([3.0, 3.0], 5), '▅▅')
+        self.assertEqual(len(sparkline([float(i) for i in range(50)], 5)), 5)
+        return
+
+    def test_append(self) -> None:
+        sl = Sparklines()
+        self.assertTrue(sl.append('AAPL', [(300, 1.0), (600, 2.0)]))
+        self.assertEqual(sl.render('AAPL'), '▁█')
+        self.assertEqual(sl.since(), {'AAPL': 600})
+        # the older bars are ignored
+        self.assertFalse(sl.append('AAPL', [(300, 5.0)]))
+        return
+
+    def test_forming_bar(self) -> None:
+        sl = Sparklines()
+        sl.append('AAPL', [(300, 1.0), (600, 2.0)])
+        self.assertFalse(sl.append('AAPL', [(600, 2.0)]))
+        # the current bar moves before the next one opens
+        self.assertTrue(sl.append('AAPL', [(600, 0.5)]))
+        self.assertEqual(sl.render('AAPL'), '█▁')
+        self.assertEqual(sl.trend('AAPL'), -0.5)
+        self.assertTrue(sl.append('AAPL', [(600, 1.5), (900, 3.0)]))
+        self.assertEqual(sl.closes['AAPL'], [1.0, 1.5, 3.0])
+        return
+
+    def test_sessions(self) -> None:
+        sl = Sparklines()
+        # a session spanning the UTC midnight, e.g. the ASX in the summer
+        midnight = 20_000 * 86400
+        sl.append('BHP.AX', [(midnight - 300, 1.0), (midnight, 2.0)])
+        sl.append('BHP.AX', [(midnight + 300, 3.0)])
+        self.assertEqual(sl.closes['BHP.AX'], [1.0, 2.0, 3.0])
+        # the next session starts over
+        sl.append('BHP.AX', [(midnight + 86400, 4.0)])
+        self.assertEqual(sl.closes['BHP.AX'], [4.0])
+        return
@@ -0,0 +1,44 @@
+import unittest
+
+from pytickrs.tickers import analyze_info, headers, info_record, number
+
+
+class TestTickers(unittest.TestCase):
+    """
+    Verify the records made of the ticker info
+    """
+
+    def test_record(self) -> None:
+        info = {
+            'fiftyTwoWeekLow': 1.0,
+            'fiftyTwoWeekHigh': 10.0,
+            'bid': 9.5,
+            'ask': 9.6,
+            'currentPrice': 9.55,
+        }
+        record = info_record('AAPL', info)
+        self.assertEqual(len(record), len(headers))
+        self.assertEqual(record[0], 'AAPL')
+        self.assertEqual(record[headers.index('Price')], 9.55)
+        self.assertEqual(record[-1], 'sell, close to high')
+        return
+
+    def test_degenerate_range(self) -> None:
+        # e.g. a newly listed symbol, the 52-week high is the low
+        info = {'fiftyTwoWeekLow': 5, 'fiftyTwoWeekHigh': 5, 'bid': 5, 'ask': 5}
+        self.assertEqual(analyze_info(info), [])
+        # the quotes are kept, only the recommendation is skipped
+        record = info_record('NEW', info)
+        self.assertEqual(record[headers.index('Low1y')], 5)
+        self.assertEqual(record[headers.index('High1y')], 5)
+        self.assertEqual(record[-1], '')
+        # missing values
+        self.assertEqual(analyze_info({'bid': None}), [])
+        return
+
+    def test_number(self) -> None:
+        self.assertEqual(number(3), 3.0)
+        self.assertIsNone(number(float('nan')))
+        self.assertIsNone(number('.'))
+        self.assertIsNone(number(None))
+        return
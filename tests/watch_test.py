@@ -0,0 +1,76 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from pytickrs.watch import FileWatcher
+
+
+class TestFileWatcher(unittest.TestCase):
+    """
+    Verify the tickers file changes are noticed, with inotify and without
+    """
+
+    use_inotify = True
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / 'tickers.txt'
+        self.path.write_text('AAPL\n')
+        self.watcher = FileWatcher(str(self.path), use_inotify=self.use_inotify)
+        return
+
+    def tearDown(self) -> None:
+        self.watcher.close()
+        self.tmp.cleanup()
+        return
+
+    def assert_changed(self) -> None:
+        self.assertTrue(self.watcher.changed())
+        self.watcher.accept()
+        self.assertFalse(self.watcher.changed())
+        return
+
+    def test_write(self) -> None:
+        self.assertFalse(self.watcher.changed())
+        with self.path.open('a') as f:
+            f.write('MSFT\n')
+        self.assert_changed()
+        return
+
+    def test_rename_over(self) -> None:
+        # the way the editors save
+        new = self.path.with_suffix('.tmp')
+        new.write_text('AAPL\nMSFT\n')
+        new.replace(self.path)
+        self.assert_changed()
+        return
+
+    def test_delete_and_recreate(self) -> None:
+        self.path.unlink()
+        self.assert_changed()
+        self.path.write_text('NVDA\n')
+        self.assert_changed()
+        return
+
+    def test_retry(self) -> None:
+        # a change not accepted is reported again
+        (Path(self.tmp.name) / 'other.txt').write_text('x')
+        self.assertFalse(self.watcher.changed())
+        self.path.write_text('')
+        self.assertTrue(self.watcher.changed())
+        self.assertTrue(self.watcher.changed())
+        self.watcher.accept()
+        self.assertFalse(self.watcher.changed())
+        return
+
+
+class TestPolling(TestFileWatcher):
+    """
+    Verify the stat polling fallback
+    """
+
+    use_inotify = False
+
+    def test_polling(self) -> None:
+        self.assertIsNone(self.watcher.fd)
+        return